@@ -1,11 +1,17 @@
 import os
-import json
+import orjson
+from functools import cached_property, lru_cache
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing_extensions import Literal
 
 from loguru import logger
+
+if TYPE_CHECKING:
+    from app.utils.negative_filter import NegativeFilter
+
 load_dotenv()
 
 parent = os.getcwd()
@@ -17,13 +23,35 @@ images_cache_path = os.path.join(parent, "cache/images_cache")
 fonts_cache_path = os.path.join(parent, "cache/fonts_cache")
 llm_cache_path = os.path.join(parent, "cache/llm_cache")
 
+cache_paths = (
+    videos_cache_path,
+    speech_cache_path,
+    audios_cache_path,
+    images_cache_path,
+    fonts_cache_path,
+    llm_cache_path,
+)
+_caches_ready = False
+
 def ensure_caches():
-    os.makedirs(videos_cache_path, exist_ok=True)
-    os.makedirs(speech_cache_path, exist_ok=True)
-    os.makedirs(audios_cache_path, exist_ok=True)
-    os.makedirs(images_cache_path, exist_ok=True)
-    os.makedirs(fonts_cache_path, exist_ok=True)
-    os.makedirs(llm_cache_path, exist_ok=True)
+    global _caches_ready
+    if _caches_ready:
+        return
+
+    # A single scandir tells us which cache dirs already exist, so the
+    # common (already initialized) case costs one syscall instead of six
+    cache_root = os.path.join(parent, "cache")
+    try:
+        with os.scandir(cache_root) as entries:
+            existing = {entry.name for entry in entries if entry.is_dir()}
+    except FileNotFoundError:
+        existing = set()
+
+    for path in cache_paths:
+        if os.path.basename(path) not in existing:
+            os.makedirs(path, exist_ok=True)
+
+    _caches_ready = True
 
 
 ensure_caches()
@@ -44,7 +72,9 @@ load_dotenv(env_file)
 
 
 class __Settings(BaseSettings):
-    model_config = SettingsConfigDict(env_file=env_file, extra="ignore")
+    # Empty values (docker-compose passes unset variables as "") fall back to
+    # the defaults instead of failing int parsing
+    model_config = SettingsConfigDict(env_file=env_file, extra="ignore", env_ignore_empty=True)
 
     IMAGE_PROVIDER: Literal["pollination", "deepinfra", "together"] = "deepinfra"
     TOGETHER_API_KEY: str | None = Field(default=None)    
@@ -52,18 +82,39 @@ class __Settings(BaseSettings):
     # SENTRY_DSN: str | None = Field(default=None)
     openai_api_key: str | None = Field(default=None, validation_alias='OPENAI_API_KEY')
     subtitle_max_chars: int = Field(default=35, validation_alias='SUBTITLE_MAX_CHARS')
-
-# all ways use this settings rather than using __Settings()
-settings = __Settings()  # type: ignore
-
-if not mode == "production":
-    # us pass and comment out the code below it when disabling logging
-    # pass
-    # Create a safe version of settings without API keys
-    safe_settings = settings.model_dump()
-    # Remove sensitive keys
-    for key in list(safe_settings.keys()):
-        if "API_KEY" in key or "KEY" in key:
-            safe_settings[key] = "***REDACTED***"
-    # Log the safe version correctly
-    logger.debug(json.dumps(safe_settings, indent=3))
+    max_bg_videos: int = Field(default=20, validation_alias='MAX_BG_VIDEOS')
+    synth_concurrency: int = Field(default=8, validation_alias='SYNTH_CONCURRENCY')
+
+    @cached_property
+    def negative_filter(self) -> "NegativeFilter":
+        """Negative keywords + compiled matcher, built once and shared via get_settings()."""
+        # imported here, negative_filter imports this module
+        from app.utils.negative_filter import NegativeFilter, load_negative_keywords
+
+        return NegativeFilter(load_negative_keywords())
+
+@lru_cache(maxsize=1)
+def get_settings() -> "__Settings":
+    """Build the settings on first use, so importers that never read them skip the validation."""
+    settings = __Settings()  # type: ignore
+
+    if not mode == "production":
+        # Log a safe version of settings without API keys. lazy=True only
+        # runs the dump + serialization when a sink actually accepts DEBUG
+        logger.opt(lazy=True).debug("{}", lambda: orjson.dumps(
+            {
+                key: "***REDACTED***" if "KEY" in key.upper() else value
+                for key, value in settings.model_dump().items()
+            },
+            option=orjson.OPT_INDENT_2,
+        ).decode())
+
+    return settings
+
+
+def __getattr__(name: str):
+    # all ways use this settings rather than using __Settings(), it is
+    # resolved lazily through get_settings() (PEP 562)
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,104 +1,153 @@
 import os
-import json
+import time
+import asyncio
+import hashlib
+import itertools
+from functools import lru_cache
+from types import MappingProxyType
+import aiohttp
+import orjson
 from loguru import logger
-import requests
-from app.utils.metrics_logger import MetricsLogger
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    retry_if_result,
+    stop_after_attempt,
+    wait_exponential,
+)
+from app.config import videos_cache_path
+from app.utils import negative_filter
+from app.utils.http_session import get_http_session
+# Re-exported for callers that read the keywords through this module
+from app.utils.negative_filter import get_negative_keywords  # noqa: F401
 
-# Add this at the module level to cache keywords
-_negative_keywords_cache = None
+# Resolved once at import instead of on every request
+PEXELS_API_KEY = os.environ.get("PEXELS_API_KEY")
+# Read-only so concurrent searches can share it without copying
+_HEADERS = MappingProxyType({"Authorization": PEXELS_API_KEY})
+_VIDEO_SEARCH_URL = "https://api.pexels.com/videos/search"
 
-# Initialize the logger at the module level
-metrics_logger = MetricsLogger()
+# Pexels responses are cached in memory and on disk, keyed by url + params
+PEXELS_CACHE_TTL = 24 * 60 * 60  # seconds
+PEXELS_MEMORY_CACHE_SIZE = 256
+_pexels_cache_dir = os.path.join(videos_cache_path, "pexels")
+_pexels_memory_cache: dict[str, tuple[float, dict]] = {}
+
+def _pexels_cache_key(url: str, params: dict) -> str:
+    payload = orjson.dumps([url, params], option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+def _remember_pexels_response(key: str, fetched_at: float, response: dict):
+    if len(_pexels_memory_cache) >= PEXELS_MEMORY_CACHE_SIZE:
+        # Dicts keep insertion order, so this drops the oldest entry
+        _pexels_memory_cache.pop(next(iter(_pexels_memory_cache)))
+    _pexels_memory_cache[key] = (fetched_at, response)
+
+# Transient statuses worth retrying instead of failing the whole search
+_PEXELS_RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=0.3, max=5),
+    retry=(
+        retry_if_exception_type((aiohttp.ClientConnectionError, asyncio.TimeoutError))
+        | retry_if_result(lambda result: result[0] in _PEXELS_RETRY_STATUSES)
+    ),
+    # Out of attempts: hand back the last response (or raise the last error)
+    retry_error_callback=lambda state: state.outcome.result(),
+)  # type: ignore
+async def _get_pexels_json(url: str, params: dict, headers: dict) -> tuple[int, dict]:
+    session = get_http_session()
+    # aiohttp already asks for gzip and decompresses transparently; parse the
+    # raw bytes so the body is never decoded to str first
+    async with session.get(url, headers=headers, params=params) as r:
+        body = await r.read()
+        status = r.status
 
-def get_negative_keywords():
-    """Load negative keywords from JSON file with caching."""
-    global _negative_keywords_cache
-    
-    # Return cached keywords if available
-    if (_negative_keywords_cache is not None):
-        return _negative_keywords_cache
-    
     try:
-        # Build path to negative_keywords.json
-        keywords_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 
-                                    "data", "negative_keywords.json")
-        
-        if os.path.exists(keywords_path):
-            logger.info(f"Loading negative keywords from {keywords_path}")
-            with open(keywords_path, 'r') as f:
-                data = json.load(f)
-                if isinstance(data, dict) and "negative_keywords" in data:
-                    _negative_keywords_cache = data["negative_keywords"]
-                    return _negative_keywords_cache
-                logger.warning("Invalid format in negative_keywords.json")
-        else:
-            logger.warning(f"Negative keywords file not found at {keywords_path}")
-            
-    except Exception as e:
-        logger.error(f"Error loading negative keywords: {e}")
-    
-    # Fallback to default keywords if something goes wrong
-    _negative_keywords_cache = [
-        "argument", "fight", "prison", "jail", "depression", 
-        "darkness", "occult", "violence", "conflict", "suffering"
-    ]
-    return _negative_keywords_cache
+        response = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        # Gateway errors come back as HTML, only a 200 must be valid JSON
+        if status == 200:
+            raise
+        response = {}
+
+    if status in _PEXELS_RETRY_STATUSES:
+        logger.warning(f"Pexels returned transient status {status} for {url}")
+    return status, response
+
+async def fetch_pexels_json(url: str, params: dict, headers: dict) -> dict:
+    """GET a Pexels endpoint, checking the memory then disk cache before the network."""
+    key = _pexels_cache_key(url, params)
+    now = time.time()
+
+    cached = _pexels_memory_cache.get(key)
+    if cached and now - cached[0] < PEXELS_CACHE_TTL:
+        return cached[1]
+
+    cache_file = os.path.join(_pexels_cache_dir, f"{key}.json")
+    try:
+        fetched_at = os.path.getmtime(cache_file)
+        if now - fetched_at < PEXELS_CACHE_TTL:
+            with open(cache_file, "rb") as f:
+                response = orjson.loads(f.read())
+            _remember_pexels_response(key, fetched_at, response)
+            logger.debug(f"Using cached Pexels response: {cache_file}")
+            return response
+    except (OSError, orjson.JSONDecodeError):
+        pass
+
+    status, response = await _get_pexels_json(url, params, headers)
+
+    # Only cache successful responses, never rate-limit or auth errors
+    if status == 200:
+        try:
+            os.makedirs(_pexels_cache_dir, exist_ok=True)
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, "wb") as f:
+                f.write(orjson.dumps(response))
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            logger.warning(f"Failed to cache Pexels response: {e}")
+        _remember_pexels_response(key, now, response)
+
+    return response
+
+def _video_filter_text(item) -> str:
+    """Searchable text of a Pexels video: description, tags, title and url slug."""
+    tags = item.get("tags")
+    # Add URL checking - critical for Pexels content
+    # Extract the descriptive part after /video/
+    _, found, url_path = (item.get("url") or "").partition("/video/")
+    return " ".join((
+        item.get("description") or "",
+        " ".join(tags) if isinstance(tags, list) else "",
+        # Also check the video title/alt
+        item.get("alt") or item.get("title") or "",
+        url_path.rsplit("/", 1)[0] if found else "",
+    ))
 
 def filter_negative_content(items, query=None, metrics_logger=None):
     """Filter out content that contains negative keywords in description, tags, or URL."""
-    keywords = get_negative_keywords()
-    filtered_results = []
-    rejected_count = 0
-    rejected_details = []
+    filtered_results, rejected = negative_filter.filter_negative_content(
+        items, _video_filter_text
+    )
+    rejected_count = len(rejected)
     
-    for item in items:
-        # Extract metadata as before
-        description = item.get("description", "").lower()
-        
-        # Handle tags
-        if "tags" in item and isinstance(item["tags"], list):
-            tags = " ".join(item["tags"]).lower()
-        else:
-            tags = ""
-            
-        # Also check the video title/alt
-        title = item.get("alt", item.get("title", "")).lower()
-        
-        # Add URL checking - critical for Pexels content
-        url = item.get("url", "").lower()
-        # Extract the descriptive part after /video/
-        if "/video/" in url:
-            url_path = url.split("/video/")[1].rsplit("/", 1)[0]
-        else:
-            url_path = ""
-        
-        # Combine all text for analysis
-        combined_text = f"{description} {tags} {title} {url_path}"
-        
-        # Check if any negative keyword appears
-        matching_keywords = [kw for kw in keywords if kw in combined_text]
-        
-        if not matching_keywords:
-            filtered_results.append(item)
-        else:
-            rejected_count += 1
-            # Store details about the rejected item
-            rejected_details.append({
-                "title": title or "Unknown",
-                "url": url,
-                "matching_keywords": matching_keywords,
-                "description": description[:100] + "..." if len(description) > 100 else description,
-                "id": item.get("id", "unknown")
-            })
-    
-    # Log summary and details
-    logger.info(f"Content filter: {rejected_count} items rejected, {len(filtered_results)} items passed")
-    
-    if rejected_details:
-        logger.info("Rejected content details:")
-        for i, details in enumerate(rejected_details, 1):
-            logger.info(f"  {i}. ID: {details['id']} - URL: {details['url']}")
-            logger.info(f"     Matched keywords: {', '.join(details['matching_keywords'])}")
+    # Log summary and details as one line; lazy=True skips building the
+    # details string when no sink accepts INFO
+    if rejected:
+        logger.opt(lazy=True).info(
+            "Content filter: {} items rejected, {} items passed. Rejected: {}",
+            lambda: rejected_count,
+            lambda: len(filtered_results),
+            lambda: ", ".join(
+                f"{item.get('id', 'unknown')}={matching_keywords}"
+                for item, matching_keywords in rejected
+            ),
+        )
+    else:
+        logger.info(f"Content filter: 0 items rejected, {len(filtered_results)} items passed")
     
     # If you want to use metrics_logger, add code like this:
     if metrics_logger:
@@ -106,6 +155,26 @@ def filter_negative_content(items, query=None, metrics_logger=None):
         
     return filtered_results
 
+def _iter_best_urls(videos, orientation, min_dur):
+    """Yield the highest quality file url of each video matching orientation and duration."""
+    for video in videos:
+        if video["duration"] < min_dur:
+            continue
+            
+        # Get the highest quality video URL that matches the requested orientation
+        best_video = max(
+            (
+                v for v in video["video_files"]
+                if ".com/video-files" in v["link"]
+                and (not orientation or get_orientation(v["width"], v["height"]) == orientation)
+            ),
+            key=lambda v: v["width"] * v["height"],
+            default=None,
+        )
+        
+        if best_video:
+            yield best_video["link"]
+
 async def search_for_stock_videos(
     limit: int = 5, 
     min_dur: int = 10, 
@@ -114,30 +183,24 @@ async def search_for_stock_videos(
     """
     Search for stock videos on Pexels with orientation and content filtering.
     """
-    # Get API key
-    PEXELS_API_KEY = os.environ.get("PEXELS_API_KEY")
-    
     if not PEXELS_API_KEY:
         logger.error("PEXELS_API_KEY not found in environment variables")
         return []
     
-    headers = {"Authorization": PEXELS_API_KEY}
-    qurl = f"https://api.pexels.com/videos/search"
-    
-    # Add orientation to query parameters
+    # One dict per call, never mutated after the request is issued, so
+    # concurrent searches can't see each other's params
     params = {
         "query": query,
         "per_page": limit * 2,  # Request more to ensure we have enough after filtering
-        "min_duration": min_dur
+        "min_duration": min_dur,
+        # Add orientation parameter if specified
+        **({"orientation": orientation} if orientation else {}),
     }
     
-    # Add orientation parameter if specified
     if orientation:
-        params["orientation"] = orientation
         logger.info(f"Searching for {orientation} videos matching '{query}'")
     
-    r = requests.get(qurl, headers=headers, params=params)
-    response = r.json()
+    response = await fetch_pexels_json(_VIDEO_SEARCH_URL, params, _HEADERS)
     
     if not response.get("videos"):
         logger.warning(f"No videos found for query '{query}' with orientation '{orientation}'")
@@ -156,65 +219,35 @@ async def search_for_stock_videos(
         filtered_videos = videos_data
 
     try:
-        for video in filtered_videos:
-            if video["duration"] < min_dur:
-                continue
-                
-            # Get the highest quality video URL
-            raw_urls = video["video_files"]
-            best_video = None
-            max_resolution = 0
-            
-            for v in raw_urls:
-                if ".com/video-files" not in v["link"]:
-                    continue
-                    
-                # Get dimensions and verify orientation
-                width, height = v["width"], v["height"]
-                video_orientation = get_orientation(width, height)
-                
-                # Skip if orientation doesn't match requested orientation
-                if orientation and video_orientation != orientation:
-                    continue
-                    
-                resolution = width * height
-                if resolution > max_resolution:
-                    max_resolution = resolution
-                    best_video = v["link"]
-            
-            if best_video:
-                video_urls.append(best_video)
-                
-            # Break if we have enough videos
-            if len(video_urls) >= limit:
-                break
-                
+        # Stops pulling videos as soon as `limit` urls have been produced;
+        # extend() keeps the urls found before a malformed video raises
+        video_urls.extend(itertools.islice(
+            _iter_best_urls(filtered_videos, orientation, min_dur), limit
+        ))
     except Exception as e:
         logger.error(f"Error processing videos: {e}")
     
     return video_urls
 
-def get_orientation(width, height):
+# Pexels only serves a handful of canonical resolutions, so memoize
+@lru_cache(maxsize=128)
+def get_orientation(width: int, height: int) -> str:
     """Determine video orientation based on dimensions"""
-    ratio = width / height
-    if ratio > 1.2:  # Wider than tall
+    # Compare width / height against 1.2 and 0.8 without a float division
+    scaled_width = width * 10
+    if scaled_width > 12 * height:  # Wider than tall
         return "landscape"
-    elif ratio < 0.8:  # Taller than wide
+    elif scaled_width < 8 * height:  # Taller than wide
         return "portrait"
     else:
         return "square"  # Close to square
 
 async def inspect_video_metadata(query="argument", orientation="landscape"):
     """Debug function to inspect raw metadata from Pexels videos."""
-    PEXELS_API_KEY = os.environ.get("PEXELS_API_KEY")
-    
     if not PEXELS_API_KEY:
         logger.error("PEXELS_API_KEY not found in environment variables")
         return
     
-    headers = {"Authorization": PEXELS_API_KEY}
-    qurl = "https://api.pexels.com/videos/search"
-    
     params = {
         "query": query,
         "per_page": 3,
@@ -222,8 +255,8 @@ async def inspect_video_metadata(query="argument", orientation="landscape"):
     }
     
     logger.info(f"Inspecting metadata for query: '{query}'")
-    r = requests.get(qurl, headers=headers, params=params)
-    videos = r.json().get("videos", [])
+    response = await fetch_pexels_json(_VIDEO_SEARCH_URL, params, _HEADERS)
+    videos = response.get("videos", [])
     
     if not videos:
         logger.info(f"No videos found for query '{query}'")
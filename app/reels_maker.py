@@ -1,7 +1,13 @@
 import os
 import sys
+import shutil
 import subprocess
 import asyncio
+import bisect
+import itertools
+from functools import lru_cache
+from typing import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
 import openai  # Add the openai import
 from openai import AsyncOpenAI  # Use the async client
 
@@ -11,16 +17,7 @@ from loguru import logger
 from datetime import datetime  # Add this import
 # Import your CsvLogger (adjust path if necessary)
 from app.utils.csv_logger import csv_logger  # Correct the import: Import the singleton instance, not the class
-from app.config import settings  # Import settings to access API keys/model name
-
-# Make PyTorch optional
-TORCH_AVAILABLE = False
-try:
-    import torch
-    TORCH_AVAILABLE = True
-except ImportError:
-    # PyTorch not available, but we can still proceed
-    pass
+from app.config import settings, videos_cache_path  # Import settings to access API keys/model name
 
 from app.base import (
     BaseEngine,
@@ -30,7 +27,9 @@ from app.base import (
     TempData,
 )
 from app.utils.strings import split_by_dot_or_newline
-from app.utils.path_util import download_resource
+from app.utils.ffprobe_batch import probe_durations
+from app.utils.path_util import download_resource, remove_file
+from app.utils.llm_cache import cache_completion, get_cached_completion, llm_cache_key
 from app.utils.metrics_logger import MetricsLogger
 from app.utils.video_match_logger import VideoMatchLogger
 from app.subtitle_gen import SubtitleGenerator, SubtitleConfig  # Import SubtitleConfig
@@ -40,11 +39,25 @@ class ReelsMakerConfig(BaseGeneratorConfig):
     max_videos: int = 3  # Add this field with default value
 
 
+# Input options of the concat-list input: don't seek around the list
+# (slow with ffmpeg >= 6), queue more packets per input thread, and
+# regenerate timestamps instead of reparsing them
+_MUX_INPUT_OPTIONS = {"seekable": 0, "thread_queue_size": 1024, "fflags": "+genpts"}
+
+
+def _concat_quote(path):
+    """Quote a path for a concat demuxer `file` directive."""
+    # Inside single quotes nothing is special but the quote itself, which is
+    # closed, escaped and reopened
+    return "'" + str(path).replace("'", "'\\''") + "'"
+
+
 def create_concat_file(clips):
     concat_filename = "concat_list.txt"
-    with open(concat_filename, "w") as f:
-        for clip in clips:
-            f.write(f"file '{clip}'\n")
+    # Built in memory and written with one binary write
+    payload = "".join(f"file {_concat_quote(clip)}\n" for clip in clips).encode("utf-8")
+    with open(concat_filename, "wb") as f:
+        f.write(payload)
     return concat_filename
 
 
@@ -52,13 +65,32 @@ def concatenate_with_filelist(clips, output_path):
     concat_filename = create_concat_file(clips)
 
     # Run FFmpeg with the concat demuxer
-    ffmpeg.input(concat_filename, format="concat", safe=0).output(
-        output_path, c="copy"
+    ffmpeg.input(concat_filename, format="concat", safe=0, **_MUX_INPUT_OPTIONS).output(
+        output_path, c="copy", movflags="+faststart"
     ).run(overwrite_output=True)
 
     return output_path
 
 
+# Stream parameters that must match for the concat demuxer to stream-copy
+_CONCAT_VIDEO_KEYS = (
+    "codec_name", "width", "height", "pix_fmt",
+    "r_frame_rate", "time_base", "sample_aspect_ratio", "profile",
+)
+_CONCAT_AUDIO_KEYS = ("codec_name", "sample_rate", "channels")
+
+
+def _concat_signature(clip):
+    """The codec parameters of a clip's streams, comparable across clips."""
+    signature = []
+    for stream in ffmpeg.probe(clip)["streams"]:
+        if stream.get("codec_type") == "video":
+            signature.append(("video", *(stream.get(key) for key in _CONCAT_VIDEO_KEYS)))
+        elif stream.get("codec_type") == "audio":
+            signature.append(("audio", *(stream.get(key) for key in _CONCAT_AUDIO_KEYS)))
+    return tuple(signature)
+
+
 def concatenate_clips(clips, output_path):
     """
     Concatenates a list of video clips.
@@ -66,17 +98,72 @@ def concatenate_clips(clips, output_path):
     - clips (list of str): List of file paths to each video clip to concatenate.
     - output_path (str): Path to save the final concatenated video.
     """
+    # Nothing to join, and nothing to probe
+    if len(clips) == 1:
+        shutil.copyfile(clips[0], output_path)
+        return output_path
+
+    # Clips with identical codec parameters are stream-copied by the concat
+    # demuxer, nothing is decoded or re-encoded
+    try:
+        # A clip repeated in the list is probed once
+        signatures = {_concat_signature(clip) for clip in dict.fromkeys(clips)}
+    except ffmpeg.Error as e:
+        logger.warning(f"Could not probe clips for stream copy: {e}")
+        signatures = set()
+    if len(signatures) == 1:
+        return concatenate_with_filelist(clips, output_path)
+
     # Prepare input streams for each clip
     streams = [ffmpeg.input(clip) for clip in clips]
 
-    # Use concat filter
-    concatenated_stream = ffmpeg.concat(*streams, v=1, a=1).output(output_path)
+    # Use concat filter; heterogeneous clips must be re-encoded, do it cheaply
+    concatenated_stream = ffmpeg.concat(*streams, v=1, a=1).output(
+        output_path, preset="ultrafast", tune="zerolatency"
+    )
 
     # Run FFmpeg
     concatenated_stream.run(overwrite_output=True)
     return output_path
 
 
+@lru_cache(maxsize=None)
+def _ffmpeg_version(ffmpeg_cmd):
+    """First line of `ffmpeg -version`, run once per binary."""
+    try:
+        result = subprocess.run([ffmpeg_cmd, "-version"],
+                                capture_output=True, text=True)
+        if result.returncode == 0:
+            return result.stdout.splitlines()[0]
+        return f"Error: {result.stderr}"
+    except Exception as e:
+        return f"Exception: {str(e)}"
+
+
+def _enable_eager_tasks():
+    """Run new tasks of the current loop eagerly, on Python 3.12+.
+
+    An eager task runs inline until its first real suspension, so cached
+    downloads and other coroutines that finish without waiting skip the
+    trip through the event loop. A task factory the caller already set is
+    left alone.
+    """
+    eager_task_factory = getattr(asyncio, "eager_task_factory", None)
+    loop = asyncio.get_running_loop()
+    if eager_task_factory is not None and loop.get_task_factory() is None:
+        loop.set_task_factory(eager_task_factory)
+
+
+def _describe_clip(clip):
+    """One-line debug description of a clip's file."""
+    path = getattr(clip, "filepath", None)
+    if path is None:
+        return f"{clip!r} (no path)"
+    if not os.path.exists(path):
+        return f"{path} (missing)"
+    return f"{path} ({os.path.getsize(path)} bytes, {clip.real_duration}s)"
+
+
 class ReelsMaker(BaseEngine):
     def __init__(self, config: ReelsMakerConfig):
         # --- Call super().__init__ FIRST ---
@@ -85,6 +172,8 @@ class ReelsMaker(BaseEngine):
         # -----------------------------------
         self.config = config  # Store the full config
         self.background_music_path = None  # Initialize background_music_path property
+        # Files in self.cwd that cleanup_temp_files must keep (absolute paths)
+        self._preserved_paths: set[str] = set()
 
         # --- Modify SubtitleGenerator Initialization ---
         # Create a specific config object for SubtitleGenerator
@@ -121,6 +210,10 @@ class ReelsMaker(BaseEngine):
         self.pexels_logger = csv_logger  # Use the singleton instance
         logger.info("Pexels CSV logger initialized.")
 
+        # prompt_generator is set by BaseEngine and never swapped, so the
+        # script method is looked up once instead of on every call
+        self._gen_script_fn = self._resolve_script_fn()
+
         # Initialize the Async OpenAI client
         # Access the attribute using the lowercase name matching Pydantic's convention
         if settings.openai_api_key:
@@ -130,31 +223,38 @@ class ReelsMaker(BaseEngine):
             self.openai_client = None
             logger.warning("OPENAI_API_KEY not found in settings. Pexels query generation via OpenAI will be skipped.")
 
-    async def _generate_script_internal(self, prompt: str) -> str:
-        """Internal method to generate a script from the prompt."""
-        try:
-            # Use the correct method from prompt_generator
-            # This looks at how the original code was generating scripts
-            if hasattr(self.prompt_generator, 'generate_content'):
-                response = await self.prompt_generator.generate_content(prompt)
+    def _resolve_script_fn(self) -> Callable[[str], Awaitable[str]]:
+        """Pick the prompt_generator method that writes scripts, once per engine."""
+        # Use the correct method from prompt_generator
+        # This looks at how the original code was generating scripts
+        generator = self.prompt_generator
+        if hasattr(generator, 'generate_content'):
+            async def generate(prompt: str) -> str:
+                response = await generator.generate_content(prompt)
                 return response.content
-            elif hasattr(self.prompt_generator, 'generate'):
-                response = await self.prompt_generator.generate(prompt)
-                return response
-            elif hasattr(self.prompt_generator, 'generate_sentences'):
-                response = await self.prompt_generator.generate_sentences(prompt, max_sentences=5)
+        elif hasattr(generator, 'generate'):
+            generate = generator.generate
+        elif hasattr(generator, 'generate_sentences'):
+            async def generate(prompt: str) -> str:
+                response = await generator.generate_sentences(prompt, max_sentences=5)
                 return " ".join(response)
-            elif hasattr(self.prompt_generator, 'generate_sentence'):
-                # Use the existing but marked as deprecated generate_sentence method
-                logger.info("Using generate_sentence method for script generation")
-                response = await self.prompt_generator.generate_sentence(prompt)
-                return response
-            else:
-                # Fall back to a simple approach if none of the expected methods exist
-                logger.warning("Could not find appropriate method in prompt_generator")
-                
-                # Create a more elaborate fallback response rather than just returning the raw prompt
+        elif hasattr(generator, 'generate_sentence'):
+            # Use the existing but marked as deprecated generate_sentence method
+            logger.info("Using generate_sentence method for script generation")
+            generate = generator.generate_sentence
+        else:
+            # Fall back to a simple approach if none of the expected methods exist
+            logger.warning("Could not find appropriate method in prompt_generator")
+
+            # Create a more elaborate fallback response rather than just returning the raw prompt
+            async def generate(prompt: str) -> str:
                 return f"Let's explore {prompt}. {prompt} is something that affects us all."
+        return generate
+
+    async def _generate_script_internal(self, prompt: str) -> str:
+        """Internal method to generate a script from the prompt."""
+        try:
+            return await self._gen_script_fn(prompt)
         except Exception as e:
             logger.exception(f"Internal script generation failed: {e}")
             return ""
@@ -198,16 +298,63 @@ class ReelsMaker(BaseEngine):
         logger.info(f"Generated search terms: {tags}")
         return tags
 
+    async def create_blank_video(self, output_path: str, duration: int = 15):
+        """Create a black fallback video without blocking the event loop."""
+        # The content only depends on these parameters, so it is encoded once
+        # and then linked (or copied, across filesystems) from the video cache
+        cache_path = os.path.join(videos_cache_path, f"blank_1080x1920_{duration}s_x264.mp4")
+        if os.path.exists(cache_path):
+            try:
+                os.link(cache_path, output_path)
+            except OSError:
+                shutil.copyfile(cache_path, output_path)
+            logger.info(f"Using cached blank video: {cache_path}")
+            return output_path
+
+        # A still frame at 1 fps, every frame a keyframe: a handful of tiny
+        # frames to encode instead of a full 25 fps stream
+        black_cmd = [
+            self.video_generator.ffmpeg_cmd,
+            "-y",
+            "-f", "lavfi",
+            "-i", f"color=c=black:s=1080x1920:d={duration}:r=1",
+            "-c:v", "libx264",
+            "-preset", "ultrafast",
+            "-tune", "stillimage",
+            "-x264-params", "keyint=1:min-keyint=1",
+            "-pix_fmt", "yuv420p",
+            "-t", str(duration),
+            output_path,
+        ]
+        proc = await asyncio.create_subprocess_exec(
+            *black_cmd,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        _, stderr = await proc.communicate()
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, black_cmd, stderr=stderr)
+
+        try:
+            # Copied then renamed, so a concurrent job never sees a partial file
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            shutil.copyfile(output_path, tmp_path)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Failed to cache blank video: {e}")
+        return output_path
+
     async def start(self, st_state=None) -> StartResponse:
         # At the beginning of the method
         self.st_state = st_state  # Store the session state
+        _enable_eager_tasks()
         
         # START LOGGING - Add this line
         self.metrics_logger.mark_start('total_generation')
         # Add this check before major processing steps
         if self.st_state and self.st_state.get("cancel_requested", False):
             logger.info("Cancellation requested, aborting video generation")
-            await self.cleanup_temp_files()
+            await self.cleanup_temp_files_async()
             return None  # Return None to indicate cancellation
 
         try:
@@ -264,8 +411,7 @@ class ReelsMaker(BaseEngine):
                 if script is None:
                     raise ValueError("Script generation failed - returned None")
                     
-                sentences = split_by_dot_or_newline(script, 100)
-                sentences = list(filter(lambda x: x != "", sentences))
+                sentences = [s for s in split_by_dot_or_newline(script, 100) if s]
                 # ADD THIS LINE - log sentence count
                 self.metrics_logger.add_metric('sentence_count', len(sentences))
             except Exception as e:
@@ -284,40 +430,47 @@ class ReelsMaker(BaseEngine):
                     script=script, max_hashtags=10
                 )
 
-                # holds all remote urls
-                remote_urls = []
+                max_videos = self.config.max_videos if hasattr(self.config, 'max_videos') else settings.max_bg_videos
 
-                max_videos = self.config.max_videos if hasattr(self.config, 'max_videos') else int(os.getenv("MAX_BG_VIDEOS", 3))
+                # one download per remote url, shared by search terms resolving to it
+                downloads: dict[str, asyncio.Future] = {}
 
-                for search_term in search_terms[:max_videos]:
+                async def fetch_video(search_term):
                     # search for a related background video
-                    video_path = await self.video_generator.get_video_url(
+                    url = await self.video_generator.get_video_url(
                         search_term=search_term
                     )
-                    if not video_path:
-                        continue
-
-                    remote_urls.append(video_path)
-
-                # download all remote videos at once
-                tasks = []
-                for url in remote_urls:
-                    # Add timeout to prevent hanging on slow downloads
-                    task = asyncio.create_task(
-                        asyncio.wait_for(
-                            download_resource(self.cwd, url),
-                            timeout=60  # 60 second timeout for downloads
+                    if not url:
+                        return None
+                    if url not in downloads:
+                        # Add timeout to prevent hanging on slow downloads
+                        downloads[url] = asyncio.ensure_future(
+                            asyncio.wait_for(
+                                download_resource(self.cwd, url),
+                                timeout=60  # 60 second timeout for downloads
+                            )
                         )
-                    )
-                    tasks.append(task)
+                    return await downloads[url]
 
-                try:
-                    local_paths = await asyncio.gather(*tasks, return_exceptions=True)
-                    # Filter out exceptions and keep only successful downloads
-                    local_paths = [path for path in local_paths if not isinstance(path, Exception)]
-                    video_paths.extend(set(local_paths))
-                except Exception as e:
-                    logger.error(f"Error downloading videos: {e}")
+                # Look every search term up at once, each download starting as
+                # soon as its url resolves instead of after the slowest lookup
+                local_paths = await asyncio.gather(
+                    *(fetch_video(search_term) for search_term in search_terms[:max_videos]),
+                    return_exceptions=True,
+                )
+                for path in local_paths:
+                    if isinstance(path, BaseException):
+                        logger.error(f"Error fetching video: {path}")
+                # Filter out failures and keep only successful downloads, in order
+                video_paths.extend(dict.fromkeys(
+                    path for path in local_paths if path and not isinstance(path, BaseException)
+                ))
+
+            # Client-supplied paths may repeat or be stale; keep each existing
+            # file once, in order, so none is probed or opened twice
+            video_paths = [
+                path for path in dict.fromkeys(video_paths) if os.path.isfile(path)
+            ]
 
             if not video_paths:
                 logger.warning("No video paths found, attempting to use default videos")
@@ -325,8 +478,12 @@ class ReelsMaker(BaseEngine):
                 # Try to load default videos from the assets directory
                 default_videos_dir = os.path.join(os.getcwd(), "assets", "default_videos")
                 if os.path.exists(default_videos_dir):
-                    default_videos = [os.path.join(default_videos_dir, f) for f in os.listdir(default_videos_dir) 
-                                      if f.endswith(('.mp4', '.mov', '.avi'))]
+                    # DirEntry carries the file type, no stat per entry
+                    with os.scandir(default_videos_dir) as entries:
+                        default_videos = [
+                            entry.path for entry in entries
+                            if entry.is_file() and entry.name.endswith(('.mp4', '.mov', '.avi'))
+                        ]
                     if default_videos:
                         logger.info(f"Using {len(default_videos)} default videos")
                         video_paths = default_videos
@@ -336,17 +493,7 @@ class ReelsMaker(BaseEngine):
                     logger.warning("No default videos found, creating blank video")
                     blank_video = os.path.join(self.cwd, "blank_video.mp4")
                     try:
-                        # Create a 15-second blank video with ffmpeg
-                        black_cmd = [
-                            self.video_generator.ffmpeg_cmd,
-                            "-f", "lavfi", 
-                            "-i", "color=c=black:s=1080x1920:d=15", 
-                            "-c:v", "libx264",
-                            "-pix_fmt", "yuv420p",
-                            "-t", "15",
-                            blank_video
-                        ]
-                        subprocess.run(black_cmd, check=True)
+                        await self.create_blank_video(blank_video)
                         video_paths = [blank_video]
                     except Exception as e:
                         logger.exception(f"Failed to create blank video: {e}")
@@ -354,7 +501,7 @@ class ReelsMaker(BaseEngine):
 
             # After video search completes - add these lines
             self.metrics_logger.mark_end('video_search')
-            max_videos = self.config.max_videos if hasattr(self.config, 'max_videos') else int(os.getenv("MAX_BG_VIDEOS", 3))
+            max_videos = self.config.max_videos if hasattr(self.config, 'max_videos') else settings.max_bg_videos
             self.metrics_logger.add_metric('videos_requested', max_videos)
             self.metrics_logger.add_metric('videos_found', len(video_paths))
             
@@ -362,34 +509,44 @@ class ReelsMaker(BaseEngine):
             self.metrics_logger.mark_start('audio_generation')
             data: list[TempData] = []
 
-            # for each sentence, generate audio
-            for sentence in sentences:
-                audio_path = await self.synth_generator.synth_speech(sentence)
+            # Synthesize all sentences concurrently, TTS calls are network bound;
+            # capped so the TTS backend doesn't rate-limit us
+            audio_paths = await self.synth_generator.synth_speech_batch(
+                sentences, max_concurrency=settings.synth_concurrency
+            )
+            for audio_path in audio_paths:
+                if isinstance(audio_path, BaseException):
+                    raise audio_path
+            # Probe every speech file in one concurrent, non-blocking batch
+            # and hand the durations to FileClip, which then probes nothing
+            speech_durations = await probe_durations(audio_paths)
+            synth_clips = [
+                FileClip(audio_path, real_duration=speech_durations[audio_path])
+                for audio_path in audio_paths
+            ]
+
+            # for each sentence, keep its audio
+            for synth_clip in synth_clips:
                 data.append(
                     TempData(
-                        synth_clip=FileClip(audio_path),
+                        synth_clip=synth_clip,
                     )
                 )
-                # After a video is selected for a sentence:
-                if hasattr(self, 'match_logger') and self.match_logger.enabled:
-                    self.match_logger.log_match(
-                        sentence=sentence,
-                        search_query=sentence,
-                        video_url=video_paths[0] if video_paths else '',  # Use actual video path
-                        voice_provider=self.config.synth_config.voice_provider,
-                        voice_name=self.config.synth_config.voice
-                    )
 
-                # --- Logging Call Using Singleton ---
-                # Call the *async* version of generate_pexels_query
-                pexels_search_query = await self.generate_pexels_query(sentence)  # <--- Use await here
+            # --- Logging Call Using Singleton ---
+            # One OpenAI call per sentence, all in flight at once;
+            # generate_pexels_query never raises, it falls back instead
+            pexels_search_queries = await asyncio.gather(
+                *(self.generate_pexels_query(sentence) for sentence in sentences)
+            )
+            for sentence, pexels_search_query in zip(sentences, pexels_search_queries):
                 if pexels_search_query:
                     csv_logger.log_sentence_query(
                         job_id=self.job_id,
                         sentence=sentence,
                         query=pexels_search_query
                     )
-                # ------------------------------------
+            # ------------------------------------
 
             # Filter out any None values from audio_clips
             audio_clips = [clip for clip in data if clip.synth_clip is not None]
@@ -404,9 +561,13 @@ class ReelsMaker(BaseEngine):
                 logger.warning("No background music path set at ReelsMaker level")
                 # Let video_generator handle this with its own null check
 
-            final_speech = ffmpeg.concat(
-                *[item.synth_clip.ffmpeg_clip for item in audio_clips], v=0, a=1
-            )
+            # A single sentence needs no concat filter in the graph
+            if len(audio_clips) == 1:
+                final_speech = audio_clips[0].synth_clip.ffmpeg_clip
+            else:
+                final_speech = ffmpeg.concat(
+                    *[item.synth_clip.ffmpeg_clip for item in audio_clips], v=0, a=1
+                )
 
             try:
                 # get subtitles from script
@@ -422,7 +583,7 @@ class ReelsMaker(BaseEngine):
                     f.write("1\n00:00:00,000 --> 00:10:00,000\n\n")
 
             # Before calling video_generator.generate_video
-            if not self.validate_subtitles_file(subtitles_path):
+            if not await asyncio.to_thread(self.validate_subtitles_file, subtitles_path):
                 logger.warning("Creating fallback subtitles file")
                 subtitles_path = os.path.join(self.cwd, "fallback_subtitles.srt")
                 with open(subtitles_path, "w") as f:
@@ -435,17 +596,12 @@ class ReelsMaker(BaseEngine):
             # Add debug logging for audio files
             logger.debug(f"Calculated video duration: {video_duration}")
             logger.debug(f"Audio clips count: {len(audio_clips)}")
-            for i, item in enumerate(audio_clips):
-                if hasattr(item, 'synth_clip') and hasattr(item.synth_clip, 'filepath'):
-                    audio_path = item.synth_clip.filepath
-                    # Check if audio_path is None before using it
-                    if audio_path is not None:
-                        logger.debug(f"Audio clip {i} path: {audio_path}")
-                        logger.debug(f"  - Exists: {os.path.exists(audio_path)}")
-                        logger.debug(f"  - Size: {os.path.getsize(audio_path) if os.path.exists(audio_path) else 'N/A'}")
-                    else:
-                        logger.debug(f"Audio clip {i} path is None")
-                    logger.debug(f"  - Duration: {item.synth_clip.real_duration}")
+            # lazy=True: the files are only stat-ed and the line formatted
+            # when a sink accepts DEBUG
+            logger.opt(lazy=True).debug(
+                "Audio clips: {}",
+                lambda: "; ".join(_describe_clip(item.synth_clip) for item in audio_clips),
+            )
 
             # Set a minimum video duration
             MIN_VIDEO_DURATION = 15  # seconds
@@ -480,75 +636,90 @@ class ReelsMaker(BaseEngine):
                     logger.warning(f"Failed to trim video {video_path}: {e}")
                     trimmed_video_paths.append(video_path)
 
+            # Probe every background video once, in one concurrent batch;
+            # the subclips reuse these durations
+            video_durations = await probe_durations(trimmed_video_paths)
             temp_videoclip: list[FileClip] = [
-                FileClip(video_path, t=max_clip_duration) for video_path in trimmed_video_paths
+                FileClip(
+                    video_path,
+                    real_duration=video_durations[video_path],
+                    t=max_clip_duration,
+                )
+                for video_path in trimmed_video_paths
             ]
 
-            final_clips: list[FileClip] = []
-
             if not temp_videoclip or all(clip.real_duration <= 0 for clip in temp_videoclip):
                 logger.warning("All video clips have zero duration, creating fallback clip")
                 # Create a fallback clip or handle the error appropriately
                 blank_video = os.path.join(self.cwd, "blank_video.mp4")
                 try:
-                    # Create a 15-second blank video with ffmpeg
-                    black_cmd = [
-                        self.video_generator.ffmpeg_cmd,
-                        "-f", "lavfi", 
-                        "-i", "color=c=black:s=1080x1920:d=15", 
-                        "-c:v", "libx264",
-                        "-pix_fmt", "yuv420p",
-                        "-t", "15",
-                        blank_video
-                    ]
-                    subprocess.run(black_cmd, check=True)
+                    await self.create_blank_video(blank_video)
                     temp_videoclip = [FileClip(blank_video, t=max_clip_duration)]
                 except Exception as e:
                     logger.exception(f"Failed to create blank video: {e}")
                     raise ValueError("Unable to create video: no source videos available")
 
-            # Add max iterations safety for the duration loop
+            # Plan the subclip durations first, cycling through the clips until
+            # the speech is covered (bounded in case every clip is empty)
             max_iterations = 1000  # Prevent infinite loop
-            iteration_count = 0
-            while tot_dur < video_duration and iteration_count < max_iterations:
-                iteration_count += 1
-                for clip in temp_videoclip:
-                    remaining_dur = video_duration - tot_dur
-                    subclip_duration = min(
-                        max_clip_duration, remaining_dur, clip.real_duration
-                    )
-                    subclip = FileClip(clip.filepath, t=subclip_duration).duplicate()
-
-                    final_clips.append(subclip)
-                    tot_dur += subclip_duration
+            plan: list[tuple[FileClip, float]] = []
+            for clip in itertools.islice(
+                itertools.cycle(temp_videoclip), max_iterations * len(temp_videoclip)
+            ):
+                if tot_dur >= video_duration:
+                    break
+                subclip_duration = min(
+                    max_clip_duration, video_duration - tot_dur, clip.real_duration
+                )
+                plan.append((clip, subclip_duration))
+                tot_dur += subclip_duration
 
-                    logger.debug(
-                        f"Total duration after adding this clip: {tot_dur}, target is {video_duration}, clip duration: {subclip_duration}"
-                    )
+            if tot_dur < video_duration:
+                logger.warning(f"Hit maximum iterations ({max_iterations}) when building video")
+            logger.debug(
+                f"Planned {len(plan)} subclips, total duration {tot_dur}, target is {video_duration}"
+            )
 
-                    if tot_dur >= video_duration:
-                        break
+            # Then materialize them in one pass. The duration is already known,
+            # so nothing is probed; duplicate() only hard links the file, each
+            # subclip needs its own path to stay a separate ffmpeg input
+            final_clips: list[FileClip] = [
+                FileClip(
+                    clip.filepath, real_duration=clip.real_duration, t=duration
+                ).duplicate()
+                for clip, duration in plan
+            ]
 
-            if iteration_count >= max_iterations:
-                logger.warning(f"Hit maximum iterations ({max_iterations}) when building video")
+            # Now that the background is laid out, log the video actually on
+            # screen when each sentence starts
+            if hasattr(self, 'match_logger') and self.match_logger.enabled:
+                clip_ends = list(itertools.accumulate(duration for _, duration in plan))
+                sentence_start = 0.0
+                for sentence, item in zip(sentences, audio_clips):
+                    index = bisect.bisect_right(clip_ends, sentence_start)
+                    self.match_logger.log_match(
+                        sentence=sentence,
+                        search_query=sentence,
+                        video_url=plan[index][0].filepath if index < len(plan) else '',
+                        voice_provider=self.config.synth_config.voice_provider,
+                        voice_name=self.config.synth_config.voice
+                    )
+                    sentence_start += item.synth_clip.real_duration
 
             # Throughout the method, add periodic checks:
             if self.st_state and self.st_state.get("cancel_requested", False):
                 logger.info("Cancellation detected during processing")
-                await self.cleanup_temp_files()
+                await self.cleanup_temp_files_async()
                 return None
 
             if st_state and self.check_cancellation(st_state):
                 raise Exception("Processing cancelled by user")
             
-            # Add to video_gen.py:generate_video before running ffmpeg
             # Debug all inputs to identify which one is None
-            for i, input_item in enumerate(final_clips):  # Adjust variable name as needed
-                logger.debug(f"Input {i}: {input_item} (type: {type(input_item)})")
-                if hasattr(input_item, 'filepath'):
-                    logger.debug(f"  - filepath: {input_item.filepath}")
-                elif isinstance(input_item, str):
-                    logger.debug(f"  - filepath exists: {os.path.exists(input_item)}")
+            logger.opt(lazy=True).debug(
+                "Video inputs: {}",
+                lambda: "; ".join(_describe_clip(clip) for clip in final_clips),
+            )
 
             final_video_path = await self.video_generator.generate_video(
                 clips=final_clips,
@@ -557,6 +728,8 @@ class ReelsMaker(BaseEngine):
                 video_duration=video_duration,
             )
 
+            self._preserved_paths.add(os.path.abspath(final_video_path))
+
             # Verify the output file exists and has content
             if os.path.exists(final_video_path) and os.path.getsize(final_video_path) > 0:
                 # Add these lines
@@ -570,8 +743,7 @@ class ReelsMaker(BaseEngine):
                 # After generating the final video, clean up large objects:
                 # Add this before returning the final response:
                 final_clips.clear()  # Release memory
-                if hasattr(self, 'cleanup_temp_files'):
-                    self.cleanup_temp_files()
+                await self.cleanup_temp_files_async()
                 return StartResponse(video_file_path=final_video_path)
             else:
                 logger.error(f"Output file missing or empty: {final_video_path}")
@@ -601,15 +773,7 @@ class ReelsMaker(BaseEngine):
         }
         
         # Check FFmpeg
-        try:
-            result = subprocess.run([self.video_generator.ffmpeg_cmd, "-version"], 
-                                    capture_output=True, text=True)
-            if result.returncode == 0:
-                diagnostics["ffmpeg_version"] = result.stdout.splitlines()[0]
-            else:
-                diagnostics["ffmpeg_version"] = f"Error: {result.stderr}"
-        except Exception as e:
-            diagnostics["ffmpeg_version"] = f"Exception: {str(e)}"
+        diagnostics["ffmpeg_version"] = _ffmpeg_version(self.video_generator.ffmpeg_cmd)
         
         # Test temp directory
         try:
@@ -625,16 +789,24 @@ class ReelsMaker(BaseEngine):
         logger.info(f"System diagnostics: {diagnostics}")
         return diagnostics
 
+    async def cleanup_temp_files_async(self):
+        """cleanup_temp_files() on a worker thread, so the unlinks don't stall the event loop."""
+        await asyncio.to_thread(self.cleanup_temp_files)
+
     def cleanup_temp_files(self):
         """Remove temporary files after successful video generation"""
         try:
-            # Keep the final video but clean up intermediate files
-            files_to_delete = [f for f in os.listdir(self.cwd) 
-                              if not f.endswith("_final.mp4") and 
-                              os.path.isfile(os.path.join(self.cwd, f))]
-            for file in files_to_delete:
-                os.remove(os.path.join(self.cwd, file))
-            logger.info(f"Cleaned up {len(files_to_delete)} temporary files")
+            # Keep the final video but clean up intermediate files; DirEntry
+            # carries the file type, so no extra stat per file
+            with os.scandir(os.path.abspath(self.cwd)) as entries:
+                files_to_delete = [
+                    entry.path for entry in entries
+                    if entry.is_file() and entry.path not in self._preserved_paths
+                ]
+            # Unlinks are independent blocking syscalls, so overlap them
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                removed = sum(executor.map(remove_file, files_to_delete))
+            logger.info(f"Cleaned up {removed} temporary files")
         except Exception as e:
             logger.warning(f"Error cleaning up temporary files: {e}")
 
@@ -651,19 +823,18 @@ class ReelsMaker(BaseEngine):
                 return False
                 
             # Check content for potential issues
-            with open(subtitles_path, 'r', encoding='utf-8') as f:
+            with open(subtitles_path, 'rb') as f:
                 content = f.read()
                 
             # Basic validation - file should have timing markers
-            if '-->' not in content:
+            if b'-->' not in content:
                 logger.warning("Invalid subtitles format: missing timing markers")
                 return False
                 
-            # Test for potential encoding issues
+            # Test for potential encoding issues, one decode of the whole file
             try:
-                for line in content.splitlines():
-                    line.encode('utf-8')  # Just to test if there are any encoding issues
-            except UnicodeEncodeError:
+                content.decode('utf-8')
+            except UnicodeDecodeError:
                 logger.warning("Subtitles file contains invalid UTF-8 characters")
                 return False
                 
@@ -718,22 +889,33 @@ class ReelsMaker(BaseEngine):
         Pexels Search Query:
         """
 
+        request = {
+            "model": settings.OPENAI_MODEL_NAME,  # Use model from settings
+            "messages": [
+                {"role": "system", "content": "You are an assistant that generates concise Pexels search queries."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.5,
+            "max_tokens": 20,
+        }
+        # The same sentence asks the same question, answer it from the cache
+        cache_key = llm_cache_key(**request)
+        cached_query = get_cached_completion(cache_key)
+        if cached_query:
+            logger.info(f"Using cached Pexels query: '{cached_query}'")
+            return cached_query
+
         for attempt in range(max_retries):
             try:
                 response = await self.openai_client.chat.completions.create(
-                    model=settings.OPENAI_MODEL_NAME,  # Use model from settings
-                    messages=[
-                        {"role": "system", "content": "You are an assistant that generates concise Pexels search queries."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.5,
-                    max_tokens=20,
+                    **request,
                     n=1,
                     stop=None,
                 )
                 generated_query = response.choices[0].message.content.strip().strip('"')
                 if generated_query:
                     logger.info(f"OpenAI generated Pexels query: '{generated_query}'")
+                    cache_completion(cache_key, generated_query)
                     return generated_query
                 else:
                     logger.warning("OpenAI returned an empty query.")
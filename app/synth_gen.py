@@ -1,8 +1,10 @@
 import os
+import asyncio
 import shutil
 import json
 import re
-from typing import Literal, Optional
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Literal, Optional
 from enum import Enum
 from uuid import uuid4
 
@@ -40,31 +42,43 @@ class SynthConfig(BaseModel):
 
     """ if we're generating static audio for test """
 
+@lru_cache(maxsize=None)
+def _elevenlabs_client(api_key: str | None) -> ElevenLabs:
+    return ElevenLabs(api_key=api_key)
+
 class SynthGenerator:
     def __init__(self, cwd: str, config: SynthConfig):
         self.config = config
         self.cwd = cwd
-        self.cache_key: str | None = None
         self.base = os.path.join(self.cwd, "audio_chunks")
         os.makedirs(self.base, exist_ok=True)
-        self.client = ElevenLabs(
-            api_key=os.getenv("ELEVENLABS_API_KEY"),
-        )
 
-    def set_speech_props(self):
+    @property
+    def client(self) -> ElevenLabs:
+        # Built on first ElevenLabs use and shared by every generator, instead
+        # of once per engine even when another provider is used
+        return _elevenlabs_client(os.getenv("ELEVENLABS_API_KEY"))
+
+    def set_speech_props(self, text: str, provider: VoiceProvider) -> tuple[str, str]:
+        """Return the (speech_path, cache_key) of one synthesis.
+
+        Kept per call rather than on self, so concurrent synth_speech calls
+        don't overwrite each other's output file.
+        """
         ky = (
             self.config.voice
             if self.config.static_mode
             else make_cuid(self.config.voice + "_")
         )
-        self.speech_path = os.path.join(
+        speech_path = os.path.join(
             self.base,
-            f"{self.config.voice_provider}_{ky}.mp3",
+            f"{provider}_{ky}.mp3",
         )
-        text_hash = text_to_sha256_hash(self.text)
-        self.cache_key = f"{self.config.voice}_{text_hash}"
+        text_hash = text_to_sha256_hash(text)
+        cache_key = f"{self.config.voice}_{text_hash}"
+        return speech_path, cache_key
 
-    async def generate_with_eleven(self, text: str) -> str:
+    async def generate_with_eleven(self, text: str, speech_path: str) -> str:
         # Prioritize config.voice over environment variable
         voice_id = self.config.voice or os.environ.get("VOICE") or "21m00Tcm4TlvDq8ikWAM"
         # Add logging for debugging
@@ -78,8 +92,8 @@ class SynthGenerator:
         audio = self.client.generate(
             text=text, voice=voice, model="eleven_multilingual_v2", stream=False
         )
-        save(audio, self.speech_path)
-        return self.speech_path
+        save(audio, speech_path)
+        return speech_path
 
     # Update the is_valid_voice method
     def is_valid_voice(self, provider: VoiceProvider, voice: str) -> bool:
@@ -108,13 +122,13 @@ class SynthGenerator:
             logger.warning(f"Voice validation error: {e}, defaulting to allow voice")
             return True  # Allow it by default if validation fails
 
-    async def generate_with_tiktok(self, text: str) -> str:
+    async def generate_with_tiktok(self, text: str, speech_path: str) -> str:
         try:
-            result = tiktokvoice.tts(text, voice=str(self.config.voice), filename=self.speech_path)
+            result = tiktokvoice.tts(text, voice=str(self.config.voice), filename=speech_path)
             # Check if the file was actually created
-            if not os.path.exists(self.speech_path) or os.path.getsize(self.speech_path) == 0:
+            if not os.path.exists(speech_path) or os.path.getsize(speech_path) == 0:
                 raise ValueError("TikTok voice generation failed to create audio file")
-            return self.speech_path
+            return speech_path
         except Exception as e:
             logger.error(f"TikTok voice generation error: {e}")
             raise
@@ -126,7 +140,7 @@ class SynthGenerator:
     #         text=text,
     #         voice=self.config.voice
     #     )
-    async def generate_with_kokoro(self, text: str, speech_rate: float = 0.8) -> Optional[str]:
+    async def generate_with_kokoro(self, text: str, speech_path: str, speech_rate: float = 0.8) -> Optional[str]:
         """Generate speech using Kokoro Service."""
         logger.info(f"Generating speech with Kokoro Service, voice: {self.config.voice}, rate: {speech_rate}")
         audio_bytes = await kokoro_client.create_speech(
@@ -135,17 +149,17 @@ class SynthGenerator:
             speed=speech_rate
         )
         if audio_bytes:
-            logger.info(f"Successfully generated speech with Kokoro, saving to {self.speech_path}")
+            logger.info(f"Successfully generated speech with Kokoro, saving to {speech_path}")
             # Save the audio bytes to file
-            os.makedirs(os.path.dirname(self.speech_path), exist_ok=True)
-            with open(self.speech_path, "wb") as f:
+            os.makedirs(os.path.dirname(speech_path), exist_ok=True)
+            with open(speech_path, "wb") as f:
                 f.write(audio_bytes)
-            return self.speech_path
+            return speech_path
         else:
             logger.error("Failed to generate audio with Kokoro, using fallback")
-            return self._create_fallback_audio(text)
+            return self._create_fallback_audio(text, speech_path)
 
-    def _create_fallback_audio(self, text: str) -> str:
+    def _create_fallback_audio(self, text: str, speech_path: str) -> str:
         """Create a fallback audio file if TTS fails."""
         logger.warning("Creating fallback silent audio file")
         from pydub import AudioSegment
@@ -154,35 +168,35 @@ class SynthGenerator:
         # Generate silent audio
         silent_audio = AudioSegment.silent(duration=duration_ms)
         # Ensure directory exists
-        os.makedirs(os.path.dirname(self.speech_path), exist_ok=True)
+        os.makedirs(os.path.dirname(speech_path), exist_ok=True)
         # Save to file
-        silent_audio.export(self.speech_path, format="mp3")
-        logger.info(f"Created fallback audio at: {self.speech_path}")
-        return self.speech_path
+        silent_audio.export(speech_path, format="mp3")
+        logger.info(f"Created fallback audio at: {speech_path}")
+        return speech_path
 
-    async def cache_speech(self, text: str):
+    async def cache_speech(self, speech_path: str, cache_key: str | None):
         try:
-            if not self.cache_key:
+            if not cache_key:
                 logger.warning("Skipping speech cache because it is not set")
                 return
-            speech_path = os.path.join(speech_cache_path, f"{self.cache_key}.mp3")
+            cached_path = os.path.join(speech_cache_path, f"{cache_key}.mp3")
             # Add check if source file exists before copying
-            if os.path.exists(self.speech_path):
-                shutil.copy2(self.speech_path, speech_path)
+            if os.path.exists(speech_path):
+                shutil.copy2(speech_path, cached_path)
             else:
-                logger.warning(f"Cannot cache speech: Source file {self.speech_path} does not exist")
+                logger.warning(f"Cannot cache speech: Source file {speech_path} does not exist")
         except Exception as e:
             logger.exception(f"Error in cache_speech(): {e}")
 
-    async def generate_with_openai(self, text: str) -> str:
+    async def generate_with_openai(self, text: str, speech_path: str) -> str:
         raise NotImplementedError
 
-    async def generate_with_airforce(self, text: str) -> str:
+    async def generate_with_airforce(self, text: str, speech_path: str) -> str:
         url = f"https://api.airforce/get-audio?text={text}&voice={self.config.voice}"
         async with httpx.AsyncClient() as client:
             res = await client.get(url)
-            save(res.content, self.speech_path)
-        return self.speech_path
+            save(res.content, speech_path)
+        return speech_path
 
     @retry(stop=stop_after_attempt(3), wait=wait_fixed(4), after=log_attempt_number) # type: ignore
     async def synth_speech(self, text: str) -> str:
@@ -197,13 +211,9 @@ class SynthGenerator:
             # Skip if this provider has already failed
             if self.config.voice_provider.lower() in self._failed_providers:
                 logger.warning(f"Skipping previously failed provider: {self.config.voice_provider}")
-                # Use TikTok as fallback
-                old_provider = self.config.voice_provider
-                self.config.voice_provider = "tiktok"
-                try:
-                    return await self._synth_with_provider(text)
-                finally:
-                    self.config.voice_provider = old_provider
+                # Use TikTok as fallback, passed down instead of swapped into
+                # self.config so concurrent calls keep their own provider
+                return await self._synth_with_provider(text, VoiceProvider.TIKTOK)
             # Attempt with configured provider
             return await self._synth_with_provider(text)
         except Exception as e:
@@ -211,31 +221,62 @@ class SynthGenerator:
             # Mark this provider as failed
             self._failed_providers.add(self.config.voice_provider.lower())
             # Switch to fallback provider
-            old_provider = self.config.voice_provider
-            self.config.voice_provider = "tiktok"  # Use TikTok as fallback
-            logger.info(f"Switching to fallback voice provider: {self.config.voice_provider}")
+            logger.info(f"Switching to fallback voice provider: {VoiceProvider.TIKTOK}")
+            return await self._synth_with_provider(text, VoiceProvider.TIKTOK)
+
+    async def synth_speech_batch(
+        self,
+        texts: list[str],
+        max_concurrency: int = 4,
+        on_result: Callable[[int, str | BaseException], Awaitable[Any]] | None = None,
+    ) -> list[str | BaseException]:
+        """Synthesize several texts, returning their speech paths in order.
+
+        Kokoro is served over HTTP without a batch endpoint, so the batch is
+        sent as concurrent requests capped at max_concurrency. A text that
+        fails comes back as its exception instead of failing the whole batch.
+        `on_result(index, result)` is awaited as soon as each text finishes, so
+        callers can start on the first sentences while the rest synthesize.
+        """
+        # Created per call, asyncio primitives bind to the running loop
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def synth_one(i: int, text: str) -> str | BaseException:
             try:
-                return await self._synth_with_provider(text)
-            finally:
-                # Restore original setting
-                self.config.voice_provider = old_provider
+                async with semaphore:
+                    result = await self.synth_speech(text)
+            except Exception as e:
+                result = e
+            if on_result:
+                await on_result(i, result)
+            return result
+
+        tasks = [asyncio.ensure_future(synth_one(i, text)) for i, text in enumerate(texts)]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            # A failing on_result must not leave the sibling syntheses, and
+            # whatever their callbacks started, running behind the error
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
 
-    async def _synth_with_provider(self, text: str) -> str:
+    async def _synth_with_provider(self, text: str, provider: VoiceProvider | None = None) -> str:
         
         # Double-check that text is not empty
         if not text or text.strip() == "":
             text = "No text was provided."
         
-        self.text = text
-        self.set_speech_props()
-        cached_speech = search_file(speech_cache_path, self.cache_key)
+        # Use the enum directly for better type safety
+        provider = provider or self.config.voice_provider
+        speech_path, cache_key = self.set_speech_props(text, provider)
+        cached_speech = search_file(speech_cache_path, cache_key)
         if cached_speech:
             logger.info(f"Found speech in cache: {cached_speech}")
-            shutil.copy2(cached_speech, self.speech_path)
+            shutil.copy2(cached_speech, speech_path)
             return cached_speech
         logger.info(f"Synthesizing text: {text}")
-        # Use the enum directly for better type safety
-        provider = self.config.voice_provider
         voice = self.config.voice
         # Validate the voice before proceeding
         if not self.is_valid_voice(provider, voice):
@@ -252,26 +293,25 @@ class SynthGenerator:
             elif provider == VoiceProvider.AIRFORCE:
                 self.config.voice = "default"
             # Update speech props with new voice
-            self.set_speech_props()
+            speech_path, cache_key = self.set_speech_props(text, provider)
             
         if provider == VoiceProvider.KOKORO:
             generator = self.generate_with_kokoro
-            speech_path = await generator(text, self.config.speech_rate)
+            await generator(text, speech_path, self.config.speech_rate)
         elif provider == VoiceProvider.ELEVENLABS:
             generator = self.generate_with_eleven
-            speech_path = await generator(text)
+            await generator(text, speech_path)
         elif provider == VoiceProvider.TIKTOK:
             generator = self.generate_with_tiktok
-            speech_path = await generator(text)
+            await generator(text, speech_path)
         elif provider == VoiceProvider.OPENAI:
             generator = self.generate_with_openai
-            speech_path = await generator(text)
+            await generator(text, speech_path)
         elif provider == VoiceProvider.AIRFORCE:
             generator = self.generate_with_airforce
-            speech_path = await generator(text)
+            await generator(text, speech_path)
         else:
             raise ValueError(f"Voice provider '{provider}' is not recognized")
-            speech_path = await generator(text)
 
-        await self.cache_speech(text)
-        return self.speech_path
\ No newline at end of file
+        await self.cache_speech(speech_path, cache_key)
+        return speech_path
\ No newline at end of file
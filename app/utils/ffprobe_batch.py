@@ -0,0 +1,55 @@
+"""Probe many media files at once with concurrent, non-blocking ffprobe runs."""
+import asyncio
+
+import orjson
+from loguru import logger
+
+# Concurrent ffprobe processes per probe_many call
+PROBE_CONCURRENCY = 16
+
+
+async def _probe(path: str, semaphore: asyncio.Semaphore, ffprobe_cmd: str) -> dict:
+    async with semaphore:
+        proc = await asyncio.create_subprocess_exec(
+            ffprobe_cmd, "-v", "error", "-print_format", "json",
+            "-show_streams", "-show_format", path,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffprobe failed for {path}: {stderr.decode(errors='replace')}")
+    return orjson.loads(stdout)
+
+
+async def probe_many(paths: list[str], ffprobe_cmd: str = "ffprobe") -> dict[str, dict | BaseException]:
+    """ffprobe every distinct path concurrently.
+
+    Maps each path to its parsed `-show_streams -show_format` output, or to the
+    exception its probe raised, so one bad file doesn't fail the batch.
+    """
+    # Created per call, asyncio primitives bind to the running loop
+    semaphore = asyncio.Semaphore(PROBE_CONCURRENCY)
+    unique_paths = list(dict.fromkeys(paths))
+    results = await asyncio.gather(
+        *(_probe(path, semaphore, ffprobe_cmd) for path in unique_paths),
+        return_exceptions=True,
+    )
+    return dict(zip(unique_paths, results))
+
+
+async def probe_durations(paths: list[str], ffprobe_cmd: str = "ffprobe") -> dict[str, float]:
+    """Duration of every path in seconds, 0 for files that can't be probed.
+
+    Same rounding and fallback as app.utils.strings.get_clip_duration.
+    """
+    durations = {}
+    for path, probe in (await probe_many(paths, ffprobe_cmd)).items():
+        try:
+            if isinstance(probe, BaseException):
+                raise probe
+            durations[path] = round(float(probe["format"]["duration"]), 2)
+        except Exception:
+            logger.warning(f"Failed to get duration of {path}")
+            durations[path] = 0
+    return durations
@@ -0,0 +1,50 @@
+"""Process-wide, connection-pooled aiohttp session shared by every HTTP client."""
+import asyncio
+
+import aiohttp
+
+# One session per event loop (streamlit runs every generation in a fresh
+# asyncio.run loop), with the async generator that closes it
+_http_sessions: dict[asyncio.AbstractEventLoop, tuple[aiohttp.ClientSession, object]] = {}
+
+
+async def _close_on_loop_shutdown(loop: asyncio.AbstractEventLoop, session: aiohttp.ClientSession):
+    """Park at the yield until the loop shuts down, then close the session.
+
+    asyncio.run() closes unfinished async generators (shutdown_asyncgens)
+    while its loop still runs, so the session and its pooled sockets are
+    closed on the loop they belong to.
+    """
+    try:
+        yield
+    finally:
+        _http_sessions.pop(loop, None)
+        await session.close()
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Return a connection-pooled aiohttp session for the running event loop."""
+    # No await in here, so concurrent coroutines on the same loop can't race
+    # to create two sessions
+    loop = asyncio.get_running_loop()
+    entry = _http_sessions.get(loop)
+    if entry is not None and not entry[0].closed:
+        return entry[0]
+
+    # Loops closed without shutting down their async generators
+    for stale_loop in [stale for stale in _http_sessions if stale.is_closed()]:
+        del _http_sessions[stale_loop]
+
+    session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=50, ttl_dns_cache=300)
+    )
+    closer = _close_on_loop_shutdown(loop, session)
+    # Step it to its yield right here, which also registers it with the
+    # loop's async generator hooks
+    try:
+        closer.asend(None).send(None)
+    except StopIteration:
+        pass
+    # The loop only keeps a weak reference to the generator
+    _http_sessions[loop] = (session, closer)
+    return session
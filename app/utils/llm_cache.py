@@ -0,0 +1,67 @@
+"""Exact-match cache for completions requested straight from the OpenAI client.
+
+The langchain chains of PromptGenerator are already cached by langchain's
+SQLiteCache; this covers the calls that bypass langchain.
+"""
+import hashlib
+import os
+import time
+
+import orjson
+from loguru import logger
+
+from app.config import llm_cache_path
+
+LLM_CACHE_TTL = 24 * 60 * 60  # seconds
+LLM_MEMORY_CACHE_SIZE = 512
+_completions_dir = os.path.join(llm_cache_path, "completions")
+_memory_cache: dict[str, tuple[float, str]] = {}
+
+
+def llm_cache_key(**request) -> str:
+    """Key of a completion request: everything that can change the answer."""
+    payload = orjson.dumps(request, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _remember(key: str, created_at: float, text: str):
+    if len(_memory_cache) >= LLM_MEMORY_CACHE_SIZE:
+        # Dicts keep insertion order, so this drops the oldest entry
+        _memory_cache.pop(next(iter(_memory_cache)))
+    _memory_cache[key] = (created_at, text)
+
+
+def get_cached_completion(key: str) -> str | None:
+    """The cached completion for key, from memory then disk, if still fresh."""
+    now = time.time()
+
+    cached = _memory_cache.get(key)
+    if cached and now - cached[0] < LLM_CACHE_TTL:
+        return cached[1]
+
+    cache_file = os.path.join(_completions_dir, f"{key}.json")
+    try:
+        created_at = os.path.getmtime(cache_file)
+        if now - created_at < LLM_CACHE_TTL:
+            with open(cache_file, "rb") as f:
+                text = orjson.loads(f.read())
+            _remember(key, created_at, text)
+            return text
+    except (OSError, orjson.JSONDecodeError):
+        pass
+    return None
+
+
+def cache_completion(key: str, text: str):
+    """Store a completion in memory and on disk."""
+    now = time.time()
+    try:
+        os.makedirs(_completions_dir, exist_ok=True)
+        cache_file = os.path.join(_completions_dir, f"{key}.json")
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(orjson.dumps(text))
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        logger.warning(f"Failed to cache LLM completion: {e}")
+    _remember(key, now, text)
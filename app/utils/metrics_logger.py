@@ -195,3 +195,7 @@ class MetricsLogger:
 
 
 
+
+
+# Create a singleton instance shared by the search modules
+metrics_logger = MetricsLogger()
@@ -0,0 +1,165 @@
+"""Negative-keyword content filter shared by the Pexels video and photo searches."""
+import re
+from bisect import bisect_right
+from pathlib import Path
+from typing import Any, Callable
+
+import orjson
+from loguru import logger
+
+from app.config import get_settings
+
+# Used when data/negative_keywords.json is missing or malformed
+DEFAULT_NEGATIVE_KEYWORDS = [
+    "argument", "fight", "prison", "jail", "depression",
+    "darkness", "occult", "violence", "conflict", "suffering"
+]
+
+# Above this many items, scan all texts in one joined regex pass instead of per item
+BATCH_FILTER_THRESHOLD = 32
+
+# Lowercases ASCII bytes without going through the unicode case tables
+_ASCII_LOWER = bytes.maketrans(
+    b"ABCDEFGHIJKLMNOPQRSTUVWXYZ", b"abcdefghijklmnopqrstuvwxyz"
+)
+
+
+class NegativeFilter:
+    """Negative keywords with their compiled matchers, built once per process.
+
+    The instance lives on the cached settings object (settings.negative_filter),
+    so workers forked after the first access inherit it instead of rebuilding it.
+    """
+
+    def __init__(self, keywords: list[str]):
+        self.keywords = keywords
+
+        # Longest first so overlapping keywords report the most specific match.
+        # An empty alternation would match everything, so fall back to never matching
+        ordered = sorted(keywords, key=len, reverse=True)
+        self.pattern = re.compile(
+            "|".join(map(re.escape, ordered)) if ordered else "(?!)"
+        )
+        # Bytes twin of the pattern for the ASCII fast path
+        self.bytes_pattern = re.compile(self.pattern.pattern.encode("utf-8"))
+
+    def filter(
+        self,
+        items: list[dict[str, Any]],
+        extractor: Callable[[dict[str, Any]], str],
+    ) -> tuple[list[dict[str, Any]], list[tuple[dict[str, Any], list[str]]]]:
+        """Split items into (kept, rejected) by matching negative keywords.
+
+        `extractor` returns the searchable text of an item, since video and photo
+        metadata expose different fields. Each rejected entry pairs the item with
+        the keywords it matched.
+        """
+        if len(items) > BATCH_FILTER_THRESHOLD:
+            return self._filter_batch(items, extractor)
+
+        findall = self.pattern.findall
+        findall_bytes = self.bytes_pattern.findall
+        kept = []
+        rejected = []
+
+        for item in items:
+            text = extractor(item)
+            if text.isascii():
+                # Pexels metadata is almost always ASCII, so lowercase and scan it
+                # as bytes; only the (rare) matches get decoded back to str
+                matches = [
+                    m.decode("ascii")
+                    for m in findall_bytes(text.encode("ascii").translate(_ASCII_LOWER))
+                ]
+            else:
+                matches = findall(text.lower())
+            if matches:
+                rejected.append((item, list(dict.fromkeys(matches))))
+            else:
+                kept.append(item)
+
+        return kept, rejected
+
+    def _filter_batch(self, items, extractor):
+        """Same result as filter(), but one regex scan over every item's text.
+
+        Large responses (curated/popular pages of up to 80 items) spend most of
+        their time in per-item Python dispatch, so the lowered texts are joined
+        with newlines (no keyword spans one) and each match is mapped back to its
+        item by offset.
+        """
+        texts = [extractor(item) for item in items]
+        # Lowercase per item: str.lower can change the length of non-ASCII text,
+        # so the offsets are taken from the already-lowered texts
+        starts = []
+        offset = 0
+        lowered = []
+        for text in texts:
+            text = text.lower()
+            starts.append(offset)
+            offset += len(text) + 1
+            lowered.append(text)
+        blob = "\n".join(lowered)
+
+        hits: dict[int, list[str]] = {}
+        if blob.isascii():
+            matches = (
+                (m.start(), m.group().decode("ascii"))
+                for m in self.bytes_pattern.finditer(blob.encode("ascii"))
+            )
+        else:
+            matches = ((m.start(), m.group()) for m in self.pattern.finditer(blob))
+        for start, keyword in matches:
+            hits.setdefault(bisect_right(starts, start) - 1, []).append(keyword)
+
+        kept = []
+        rejected = []
+        for index, item in enumerate(items):
+            keywords = hits.get(index)
+            if keywords:
+                rejected.append((item, list(dict.fromkeys(keywords))))
+            else:
+                kept.append(item)
+
+        return kept, rejected
+
+
+def load_negative_keywords() -> list[str]:
+    """Load negative keywords from data/negative_keywords.json."""
+    try:
+        # Build path to <repo>/data/negative_keywords.json
+        keywords_path = Path(__file__).resolve().parents[2] / "data" / "negative_keywords.json"
+
+        if keywords_path.exists():
+            logger.info(f"Loading negative keywords from {keywords_path}")
+            # One read of the whole (small) file, parsed straight from bytes
+            data = orjson.loads(keywords_path.read_bytes())
+            if isinstance(data, dict):
+                data = data.get("negative_keywords")
+            if isinstance(data, list):
+                # Lowercased and de-duplicated once here instead of per filter call
+                return list(
+                    dict.fromkeys(kw.lower() for kw in data if isinstance(kw, str) and kw)
+                )
+            logger.warning("Invalid format in negative_keywords.json")
+        else:
+            logger.warning(f"Negative keywords file not found at {keywords_path}")
+
+    except Exception as e:
+        logger.error(f"Error loading negative keywords: {e}")
+
+    # Fallback to default keywords if something goes wrong
+    return list(DEFAULT_NEGATIVE_KEYWORDS)
+
+
+def get_negative_keywords() -> list[str]:
+    """Return the process-wide negative keywords."""
+    return get_settings().negative_filter.keywords
+
+
+def filter_negative_content(
+    items: list[dict[str, Any]],
+    extractor: Callable[[dict[str, Any]], str],
+) -> tuple[list[dict[str, Any]], list[tuple[dict[str, Any], list[str]]]]:
+    """Filter items with the process-wide NegativeFilter, see NegativeFilter.filter."""
+    return get_settings().negative_filter.filter(items, extractor)
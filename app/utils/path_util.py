@@ -4,17 +4,32 @@ import asyncio
 import hashlib
 import os
 import shutil
+import tempfile
 
 import aiohttp
 from loguru import logger
 from tenacity import retry, stop_after_attempt, wait_fixed
 
+from app.utils.http_session import get_http_session
+
 
 def text_to_sha256_hash(text):
     return hashlib.sha256(text.encode()).hexdigest()
 
 
 
+def remove_file(path: str) -> bool:
+    """Remove a file if it exists, logging instead of raising on failure."""
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+    except OSError as e:
+        logger.warning(f"Failed to remove temporary file {path}: {e}")
+        return False
+
+
 def search_file(directory, file) -> str | None:
     assert os.path.isdir(directory)
     import re
@@ -27,9 +42,13 @@ def search_file(directory, file) -> str | None:
     return None
 
 
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # bytes
+
+
 @retry(stop=stop_after_attempt(5), wait=wait_fixed(5)) # type: ignore
 async def download_resource(
-    dir, url, cache_dir=videos_cache_path, disable_cache=False
+    dir, url, cache_dir=videos_cache_path, disable_cache=False,
+    session: aiohttp.ClientSession | None = None,
 ) -> str:
     filename = os.path.basename(url)
     file_path = os.path.join(dir, filename)
@@ -41,14 +60,29 @@ async def download_resource(
             logger.info(f"Found resource in cache: {file_cache_path}")
             return file_path
 
-    async with aiohttp.ClientSession() as session:
-        logger.info(f"Downloading resource from: {url}")
-        async with session.get(url) as response:
-            with open(file_path, "wb") as f:
-                f.write(await response.read())
-                logger.debug(f"Downloaded resource from: {url}")
+    # Shared, connection-pooled session: downloads reuse the sockets and TLS
+    # sessions of earlier lookups and downloads instead of a fresh handshake
+    session = session or get_http_session()
+    logger.info(f"Downloading resource from: {url}")
+    async with session.get(url) as response:
+        # An error page must not be saved (and cached) as the resource
+        response.raise_for_status()
+        # Streamed to disk chunk by chunk, a large video is never held in
+        # memory whole; written to a unique temp file, so concurrent
+        # downloads of the same resource don't share it and a failed
+        # download leaves no truncated file behind
+        fd, part_path = tempfile.mkstemp(dir=os.path.dirname(file_path) or ".", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+            os.replace(part_path, file_path)
+        except BaseException:
+            remove_file(part_path)
+            raise
+    logger.debug(f"Downloaded resource from: {url}")
 
-                # save to cache audios
-                shutil.copy2(file_path, cache_dir)
-                return os.path.join(dir, os.path.basename(url))
+    # save to cache audios, once the file is closed and fully written
+    shutil.copy2(file_path, cache_dir)
+    return os.path.join(dir, os.path.basename(url))
 
@@ -4,18 +4,24 @@ import spacy
 
 import os
 import shutil
-import tempfile
+from functools import lru_cache
 from typing import Any
+from uuid import uuid4
 from cuid2 import Cuid
 import ffmpeg
 from loguru import logger
 from pydub import AudioSegment
 
+@lru_cache(maxsize=1)
+def _sentence_nlp():
+    # Loading the model takes far longer than splitting a script, load it once
+    return spacy.load("en_core_web_sm")
+
+
 def split_by_dot_or_newline(text: str, min_char_len: int = 80) -> list[str]:
     """Splits text into sentences using spacy and merges short sentences to a minimum character length."""
 
-    nlp = spacy.load("en_core_web_sm")
-    doc = nlp(text)
+    doc = _sentence_nlp()(text)
     sentences = [sent.text.strip() for sent in doc.sents]
 
     # Merge sentences that are too short
@@ -50,10 +56,12 @@ FFMPEG_TYPE = Any
 
 
 class FileClip:
-    def __init__(self, filepath: str, **kwargs):
+    def __init__(self, filepath: str, real_duration: float | None = None, **kwargs):
         self.filepath = filepath
         self.kwargs = kwargs
-        self.real_duration = get_clip_duration(self.filepath)
+        self.real_duration = (
+            get_clip_duration(self.filepath) if real_duration is None else real_duration
+        )
         self.ffmpeg_clip: FFMPEG_TYPE = ffmpeg.input(filepath, **kwargs)
 
         if kwargs.get("t"):
@@ -65,14 +73,18 @@ class FileClip:
         duplicates_dir = os.path.join(os.path.dirname(self.filepath), "duplicates")
         os.makedirs(duplicates_dir, exist_ok=True)
 
-        with tempfile.NamedTemporaryFile(
-            delete=False,
-            dir=duplicates_dir,
-            suffix=f"_{os.path.basename(self.filepath)}",
-        ) as temp_file:
-            shutil.copyfile(self.filepath, temp_file.name)
+        # Only a distinct path is needed (ffmpeg-python merges identical input
+        # nodes), so hard link the file and copy it only across filesystems
+        duplicate_path = os.path.join(
+            duplicates_dir, f"{uuid4().hex}_{os.path.basename(self.filepath)}"
+        )
+        try:
+            os.link(self.filepath, duplicate_path)
+        except OSError:
+            shutil.copyfile(self.filepath, duplicate_path)
 
-        return FileClip(temp_file.name, **self.kwargs)
+        # The same bytes, no need to probe it again
+        return FileClip(duplicate_path, real_duration=self.real_duration, **self.kwargs)
 
 
 def get_video_size(input_path: str) -> tuple[int, int]:
@@ -89,11 +101,16 @@ def get_video_size(input_path: str) -> tuple[int, int]:
     return width, height
 
 
+@lru_cache(maxsize=512)
+def _probe_duration(file_path: str, mtime_ns: int, size: int) -> float:
+    # Keyed on mtime and size too, so a rewritten file is probed again
+    return round(float(ffmpeg.probe(file_path)["format"]["duration"]), 2)
+
+
 def get_clip_duration(file_path):
     try:
-        probe = ffmpeg.probe(file_path)
-        duration = float(probe["format"]["duration"])
-        duration = round(duration, 2)
+        stat = os.stat(file_path)
+        duration = _probe_duration(file_path, stat.st_mtime_ns, stat.st_size)
     except Exception:
         logger.warning(f"Failed to get duration of {file_path}")
         duration = 0
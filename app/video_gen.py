@@ -4,6 +4,7 @@ import random
 from typing import TYPE_CHECKING, Literal
 from pathlib import Path
 import subprocess
+from functools import lru_cache
 
 from app.effects import zoom_in_effect, zoom_out_effect
 from app.utils.strings import (
@@ -40,6 +41,38 @@ positions = {
 }
 
 
+# Hardware H.264 encoders in order of preference, with their options; each is
+# tried with a tiny test encode, since -encoders lists every encoder compiled
+# into the build whether or not the host has the hardware
+_HW_ENCODERS = {
+    "h264_nvenc": {"preset": "p4", "tune": "hq", "rc": "vbr", "cq": 28},
+    "h264_qsv": {"preset": "veryfast", "global_quality": 28},
+    "h264_videotoolbox": {"b:v": "8M"},
+}
+
+
+@lru_cache(maxsize=None)
+def detect_hwenc(ffmpeg_cmd: str = "ffmpeg") -> str | None:
+    """The first hardware H.264 encoder ffmpeg can actually use here, if any."""
+    for encoder in _HW_ENCODERS:
+        try:
+            result = subprocess.run(
+                [ffmpeg_cmd, "-hide_banner", "-loglevel", "error",
+                 "-f", "lavfi", "-i", "color=black:s=256x256:d=0.1",
+                 "-c:v", encoder, "-f", "null", "-"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=15,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            continue
+        if result.returncode == 0:
+            logger.info(f"Using hardware H.264 encoder: {encoder}")
+            return encoder
+    logger.info("No hardware H.264 encoder available, using libx264")
+    return None
+
+
 class VideoGeneratorConfig(BaseModel):
     fontsize: int = 80
     stroke_color: str = "#ffffff"
@@ -62,6 +95,8 @@ class VideoGeneratorConfig(BaseModel):
     color_effect: str = "gray"
     # Options: ultrafast, superfast, veryfast, faster, fast, medium
     cpu_preset: str = "ultrafast"
+    # Encode with NVENC / Quick Sync / VideoToolbox when the host supports it
+    hw_encode: bool = True
 
 
 class VideoGenerator:
@@ -121,6 +156,15 @@ class VideoGenerator:
                 self.ffmpeg_cmd = "ffmpeg"
                 logger.warning("Using 'ffmpeg' command as last resort")
 
+        self.hwenc = detect_hwenc(self.ffmpeg_cmd) if self.config.hw_encode else None
+
+    def encoder_options(self) -> dict:
+        """Output options of the final H.264 encode."""
+        if self.hwenc:
+            return {"vcodec": self.hwenc, **_HW_ENCODERS[self.hwenc]}
+        # Lower quality but faster (range 18-28)
+        return {"vcodec": "libx264", "preset": "ultrafast", "crf": 28}
+
     async def get_video_url(self, search_term: str) -> str | None:
         """Get a video URL based on search term and target aspect ratio"""
 
@@ -235,14 +279,13 @@ class VideoGenerator:
             force_style=style
         )
 
-    def add_audio_mix(self, video_stream, background_music_filter, tts_audio_filter):
-        audio_mix = ffmpeg.filter(
+    def mix_audio(self, background_music_filter, tts_audio_filter):
+        return ffmpeg.filter(
             stream_spec=[background_music_filter, tts_audio_filter],
             filter_name="amix",
             duration="longest",
             dropout_transition=0,
         )
-        return ffmpeg.concat(video_stream, audio_mix, v=1, a=1)
 
     def concatenate_clips(self, inputs: list[FileClip], effects: list = []):
         processed_clips = []
@@ -322,29 +365,6 @@ class VideoGenerator:
         # Define output path
         output_path = (Path(self.cwd) / f"{self.job_id}_final.mp4").as_posix()
 
-        # In video_gen.py, inside generate_video method
-        if self.config.background_music_path is None or not os.path.exists(self.config.background_music_path):
-            logger.warning(
-                f"Background music path not found: {self.config.background_music_path}")
-
-            # Create a silent audio file in the temp directory instead
-            silent_audio = os.path.join(os.path.dirname(
-                subtitles_path), "silent_audio.mp3")
-
-            try:
-                # Create a silent audio file using ffmpeg
-                logger.info(f"Generating silent audio file at {silent_audio}")
-                (
-                    ffmpeg.input('anullsrc', f='lavfi', t=10)
-                    .output(silent_audio, ar=44100)
-                    .run(overwrite_output=True, cmd=self.ffmpeg_cmd, quiet=True)
-                )
-                self.config.background_music_path = silent_audio
-            except Exception as e:
-                logger.exception(f"Failed to create silent audio: {e}")
-                # Proceed without background music by creating an input with silence
-                # We'll handle this in the ffmpeg pipeline
-
         # music must end at the end of the speech, add extra 3 seconds to make it look good
         try:
             # First try to use the background music file
@@ -382,24 +402,24 @@ class VideoGenerator:
         video_stream = self.apply_aspect_ratio(video_stream)
         video_stream = self.apply_subtitles(video_stream, subtitles_path)
         video_stream = self.apply_watermark(video_stream)
-        video_stream = self.add_audio_mix(
-            video_stream=video_stream,
+        # Mixed inside the same graph and muxed straight into the output, no
+        # concat pass just to pair the audio with the video
+        audio_stream = self.mix_audio(
             tts_audio_filter=speech_filter,
             background_music_filter=music_input,
         )
         try:
-            # Use CPU encoding instead of GPU
-            logger.info("Using CPU encoding for video processing")
+            encoder_options = self.encoder_options()
+            logger.info(f"Encoding video with {encoder_options['vcodec']}")
             output = (
                 ffmpeg
                 .output(
                     video_stream,
+                    audio_stream,
                     output_path,
-                    vcodec="libx264",  # CPU encoder instead of h264_nvenc
                     acodec="aac",
-                    preset="ultrafast",  # CPU-friendly preset
-                    crf=28,  # Lower quality but faster (range 18-28)
                     pix_fmt="yuv420p",
+                    **encoder_options,
                     movflags="+faststart"
                 )
                 .global_args('-progress', 'pipe:1')
@@ -1,79 +1,51 @@
 from loguru import logger
 import os
-import requests
-import json
 import time
-from typing import List, Dict, Optional, Tuple, Any
-from app.utils.metrics_logger import MetricsLogger
+from functools import lru_cache
+from types import MappingProxyType
+from typing import List, Dict, Literal, Optional, Tuple, Any
+from app.utils import negative_filter
+from app.utils.metrics_logger import metrics_logger as default_metrics_logger
+from app.utils.negative_filter import get_negative_keywords
+from app.pexel import fetch_pexels_json
 
-# Add this at the module level to cache keywords
-_negative_keywords_cache = None
+# Resolved once at import instead of on every request
+PEXELS_API_KEY = os.environ.get("PEXELS_API_KEY")
+# Read-only so concurrent searches can share it without copying
+_HEADERS = MappingProxyType({"Authorization": PEXELS_API_KEY})
+_PHOTO_SEARCH_URL = os.environ.get("PEXELS_PHOTO_API_URL", "https://api.pexels.com/v1/search")
+if not _PHOTO_SEARCH_URL.endswith("search"):
+    _PHOTO_SEARCH_URL = "https://api.pexels.com/v1/search"
+_PHOTO_CURATED_URL = os.environ.get("PEXELS_PHOTO_API_URL_CURATED", "https://api.pexels.com/v1/curated")
+_PHOTO_POPULAR_URL = "https://api.pexels.com/v1/popular"
+_PHOTO_BY_ID_URL = "https://api.pexels.com/v1/photos/"
 
-# Initialize the logger at the module level
-metrics_logger = MetricsLogger(enabled=True)
-metrics_logger.initialize()  # Make sure this is called
+PhotoEndpointType = Literal["search", "curated", "popular", "id"]
 
-def get_negative_keywords():
-    """Load negative keywords from JSON file with caching."""
-    global _negative_keywords_cache
-    
-    # Return cached keywords if available
-    if (_negative_keywords_cache is not None):
-        return _negative_keywords_cache
-    
-    try:
-        import json
-        import os
-        
-        # Path to the negative keywords file (adjust path as necessary)
-        file_path = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)), 
-            "data", 
-            "negative_keywords.json"
-        )
-        
-        if os.path.exists(file_path):
-            with open(file_path, "r") as f:
-                _negative_keywords_cache = json.load(f)
-                logger.info(f"Loaded {len(_negative_keywords_cache)} negative keywords")
-                return _negative_keywords_cache
-    except Exception as e:
-        logger.error(f"Failed to load negative keywords: {e}")
-    
-    # Fallback to default keywords if something goes wrong
-    _negative_keywords_cache = [
-        "argument", "fight", "prison", "jail", "depression", 
-        "darkness", "occult", "violence", "conflict", "suffering"
-    ]
-    return _negative_keywords_cache
+# endpoint_type -> (url, whether the endpoint takes the search query)
+_PHOTO_ENDPOINTS: Dict[str, Tuple[str, bool]] = {
+    "search": (_PHOTO_SEARCH_URL, True),
+    "curated": (_PHOTO_CURATED_URL, False),
+    "popular": (_PHOTO_POPULAR_URL, False),
+}
+
+def _photo_filter_text(item) -> str:
+    """Searchable text of a Pexels photo: alt description and photographer name."""
+    # Newline-separated so a keyword can't match across the two fields
+    return f"{item.get('alt') or ''}\n{item.get('photographer') or ''}"
 
 def filter_negative_content(items, query=None, metrics_logger=None):
     """Filter out content that contains negative keywords in description, tags, or URL."""
-    negative_keywords = get_negative_keywords()
-    
-    if not negative_keywords:
+    if not get_negative_keywords():
         logger.warning("No negative keywords available for filtering")
         return items, [], []
-        
-    filtered_items = []
-    rejected_items = []  # Store rejected items for logging
-    rejected_keywords = set()  # Track which keywords caused rejection
-    
-    for item in items:
-        is_rejected = False
-        description = item.get("alt", "").lower() if item.get("alt") else ""
-        photographer = item.get("photographer", "").lower() if item.get("photographer") else ""
-        
-        # Check for negative keywords in description or photographer name
-        for keyword in negative_keywords:
-            if keyword.lower() in description or keyword.lower() in photographer:
-                rejected_items.append(item)
-                rejected_keywords.add(keyword)
-                is_rejected = True
-                break
-                
-        if not is_rejected:
-            filtered_items.append(item)
+
+    filtered_items, rejected = negative_filter.filter_negative_content(
+        items, _photo_filter_text
+    )
+    rejected_items = [item for item, _ in rejected]  # Store rejected items for logging
+    # Track which keywords caused rejection
+    rejected_keywords = {kw for _, keywords in rejected for kw in keywords}
     
     # Log the rejected keywords if metrics_logger is provided
     if metrics_logger and rejected_keywords:
@@ -87,7 +59,7 @@ async def search_for_stock_photos(
     limit: int = 5, 
     query: str = "nature",
     orientation: str = None,
-    endpoint_type: str = "search",  # New parameter to select endpoint type
+    endpoint_type: PhotoEndpointType = "search",  # New parameter to select endpoint type
     metrics_logger=None,
     photo_match_logger=None) -> list[Dict]:
     """
@@ -105,59 +77,37 @@ async def search_for_stock_photos(
         List of photo information dictionaries
     """
     # Use the metrics logger if provided, otherwise use module-level
-    _metrics_logger = metrics_logger if metrics_logger is not None else globals().get('metrics_logger')
+    _metrics_logger = metrics_logger if metrics_logger is not None else default_metrics_logger
     
     # Log the search query being used
     if _metrics_logger:
         _metrics_logger.log_search_query(query)
     
-    # Get the API key
-    PEXELS_API_KEY = os.environ.get("PEXELS_API_KEY")
     if not PEXELS_API_KEY:
         logger.error("Pexels API key not found in environment variables")
         return []
     
-    headers = {"Authorization": PEXELS_API_KEY}
-    
     # Determine which endpoint to use
-    if endpoint_type == "search":
-        qurl = os.environ.get("PEXELS_PHOTO_API_URL", "https://api.pexels.com/v1/search")
-        if not qurl.endswith("search"):
-            qurl = "https://api.pexels.com/v1/search"
-        
-        params = {
-            "query": query,
-            "per_page": limit * 2,  # Request more than needed to account for filtering
-        }
-        
-        # Add orientation parameter if specified
-        if orientation:
-            params["orientation"] = orientation
-    
-    elif endpoint_type == "curated":
-        qurl = os.environ.get("PEXELS_PHOTO_API_URL_CURATED", "https://api.pexels.com/v1/curated")
-        params = {
-            "per_page": limit * 2
-        }
-        
-    elif endpoint_type == "popular":
-        qurl = "https://api.pexels.com/v1/popular"
-        params = {
-            "per_page": limit * 2
-        }
-        
-    elif endpoint_type == "id" and query.isdigit():
+    if endpoint_type == "id" and query.isdigit():
         # Direct photo by ID lookup
-        qurl = f"https://api.pexels.com/v1/photos/{query}"
+        qurl = _PHOTO_BY_ID_URL + query
         params = {}
     else:
-        # Default to search if unrecognized endpoint type
-        logger.warning(f"Unrecognized endpoint type '{endpoint_type}', falling back to search")
-        qurl = os.environ.get("PEXELS_PHOTO_API_URL", "https://api.pexels.com/v1/search")
-        params = {
-            "query": query,
-            "per_page": limit * 2
-        }
+        endpoint = _PHOTO_ENDPOINTS.get(endpoint_type)
+        if endpoint is None:
+            # Default to search if unrecognized endpoint type
+            logger.warning(f"Unrecognized endpoint type '{endpoint_type}', falling back to search")
+            endpoint_type = "search"
+            endpoint = _PHOTO_ENDPOINTS["search"]
+        qurl, takes_query = endpoint
+
+        # Request more than needed to account for filtering
+        params = {"per_page": limit * 2}
+        if takes_query:
+            params["query"] = query
+            # Add orientation parameter if specified
+            if orientation:
+                params["orientation"] = orientation
     
     # Start timing photo search
     if _metrics_logger:
@@ -165,8 +115,7 @@ async def search_for_stock_photos(
     
     # Request photos
     try:
-        r = requests.get(qurl, headers=headers, params=params)
-        response = r.json()
+        response = await fetch_pexels_json(qurl, params, _HEADERS)
     except Exception as e:
         logger.error(f"Error fetching photos from Pexels: {e}")
         return []
@@ -209,13 +158,16 @@ async def search_for_stock_photos(
     # Return limited number of filtered photos
     return filtered_photos[:limit]
 
-def get_orientation(width, height):
+# Pexels only serves a handful of canonical resolutions, so memoize
+@lru_cache(maxsize=128)
+def get_orientation(width: int, height: int) -> str:
     """Determine orientation based on image dimensions."""
-    ratio = width / height
+    # Compare width / height against 1.1 and 0.9 without a float division
+    scaled_width = width * 10
     
-    if ratio > 1.1:  # Wider than tall
+    if scaled_width > 11 * height:  # Wider than tall
         return "landscape"
-    elif ratio < 0.9:  # Taller than wide
+    elif scaled_width < 9 * height:  # Taller than wide
         return "portrait"
     else:  # Approximately square
         return "square"
@@ -1,22 +1,22 @@
 from loguru import logger
 import os
 import ffmpeg
+import asyncio
+import random
 import aiohttp
 import tempfile
 from pathlib import Path
 import multiprocessing
 import time
 import shutil
+from itertools import accumulate
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import wave
+from uuid import uuid4
+import orjson
 
-# Make PyTorch optional
-TORCH_AVAILABLE = False
-try:
-    import torch
-    TORCH_AVAILABLE = True
-except ImportError:
-    # PyTorch not available, but we can still proceed
-    pass
-
+from app.config import images_cache_path
 from app.base import (
     BaseEngine,
     BaseGeneratorConfig,
@@ -25,12 +25,14 @@ from app.base import (
     TempData,
 )
 from app.utils.strings import split_by_dot_or_newline
-from app.utils.path_util import download_resource
+from app.utils.path_util import download_resource, remove_file
 from app.utils.metrics_logger import MetricsLogger
 from app.photo_video_gen import PhotoVideoGenerator
-from app.synth_gen import SynthGenerator, SynthConfig, VoiceProvider
+from app.synth_gen import SynthConfig, VoiceProvider
 from app.photo_pexel import search_for_stock_photos
-from typing import List, Dict, Optional, Any, Union
+from app.utils.http_session import get_http_session
+from app.pexel import PEXELS_CACHE_TTL
+from typing import List, Dict, Optional, Any, Union, Awaitable, Callable
 
 class PhotoReelsMakerConfig(BaseGeneratorConfig):
     max_photos: int = 3  # Default max photos per segment
@@ -43,9 +45,60 @@ class PhotoReelsMakerConfig(BaseGeneratorConfig):
     speech_rate: float = 1.0  # Default speech rate
     aspect_ratio: str = "16:9"  # Default aspect ratio (16:9, 9:16, or 1:1)
     background_audio_url: Optional[str] = None  # Background music URL
+    encode_threads: int = multiprocessing.cpu_count()  # x264 threads per encode
+    encode_preset: Optional[str] = None  # x264 preset for every encode, e.g. "medium"; None picks fast ones
+
+# Bounds concurrent Pexels traffic so a long script doesn't trip the rate limit
+PEXELS_MAX_CONCURRENCY = 8
+PHOTO_DOWNLOAD_ATTEMPTS = 4
+PHOTO_DOWNLOAD_TIMEOUT = aiohttp.ClientTimeout(total=60)
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Keeps the TTS backend (e.g. a local Kokoro model) from being oversubscribed
+TTS_MAX_CONCURRENCY = 4
+SILENT_AUDIO_RATE = 16000  # Hz, for the silent fallback clips
+
+# Pexels orientation for each aspect ratio, anything else is landscape
+_ASPECT_RATIO_ORIENTATIONS = {"9:16": "portrait", "1:1": "square"}
+
+# Downloaded photos (keyed by url) + the Pexels metadata each search
+# resolved to (keyed by search), reused across runs
+photo_cache_path = os.path.join(images_cache_path, "pexels_photos")
+
+def _audio_duration(path: str) -> float:
+    """Duration in seconds of an audio file, read from its header without decoding samples."""
+    try:
+        if path.endswith(".wav"):
+            with wave.open(path, "rb") as w:
+                return w.getnframes() / w.getframerate()
+        return float(ffmpeg.probe(path)["format"]["duration"])
+    except Exception as e:
+        logger.warning(f"Failed to read duration of {path} from its header ({e}), decoding it")
+        from pydub import AudioSegment
+        return len(AudioSegment.from_file(path)) / 1000.0  # Convert ms to seconds
+
+def _photo_cache_file(photo_url: str) -> str:
+    """Cache path of a downloaded photo, shared by every search resolving to it."""
+    return os.path.join(photo_cache_path, f"{hashlib.sha1(photo_url.encode()).hexdigest()}.jpg")
+
+def _srt_time(ms: int) -> str:
+    """SRT timestamp (HH:MM:SS,mmm) for an integer millisecond offset."""
+    hours, rem = divmod(ms, 3_600_000)
+    minutes, rem = divmod(rem, 60_000)
+    seconds, milliseconds = divmod(rem, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
 
 class PhotoReelsMaker(BaseEngine):
     def __init__(self, config: PhotoReelsMakerConfig):
+        # Synthesizer config for audio generation, set before the base init so
+        # the SynthGenerator BaseEngine builds is the only one
+        self.synth_config = SynthConfig(
+            voice=config.voice,
+            voice_provider=config.voice_provider,
+            speech_rate=config.speech_rate
+        )
+        # On a copy, the caller's config may be reused for another run
+        config = config.model_copy(update={"synth_config": self.synth_config})
+        
         super().__init__(config)
         self.config = config
         
@@ -56,14 +109,6 @@ class PhotoReelsMaker(BaseEngine):
         # Initialize photo video generator
         self.photo_video_generator = PhotoVideoGenerator(self)
         
-        # Initialize the synthesizer for audio generation
-        self.synth_config = SynthConfig(
-            voice=self.config.voice,
-            voice_provider=self.config.voice_provider,
-            speech_rate=self.config.speech_rate
-        )
-        self.synth_generator = SynthGenerator(self.cwd, self.synth_config)
-        
         # Initialize audio_clips to avoid AttributeError in cleanup
         self.audio_clips = []
         self.subtitles_path = None
@@ -90,11 +135,16 @@ class PhotoReelsMaker(BaseEngine):
         # This is a simplified placeholder - in production this would use your LLM integration
         return f"Here is a story about {prompt}. It showcases beautiful imagery with an engaging narrative."
         
-    async def generate_search_terms(self, script, max_hashtags: int = 5):
-        """Generate search terms based on the script for photo searches."""
+    async def generate_search_terms(self, script, max_hashtags: int = 5, sentences: Optional[List[str]] = None):
+        """Generate search terms based on the script for photo searches.
+        
+        Pass `sentences` when the script was already split, so it isn't split
+        (and the spacy model loaded) a second time.
+        """
         # For simplicity, we'll just use the sentences as search terms
         # In production, you might want to use LLM to extract better keywords
-        sentences = split_by_dot_or_newline(script)
+        if sentences is None:
+            sentences = split_by_dot_or_newline(script)
         search_terms = [sentence.strip() for sentence in sentences if sentence.strip()]
         
         # Limit to first few sentences if too many
@@ -108,10 +158,32 @@ class PhotoReelsMaker(BaseEngine):
         """Download photos based on search terms."""
         logger.info(f"Downloading photos for {len(search_terms)} search terms using {endpoint_type} endpoint")
         
-        photos_data = []
+        # All terms are fetched concurrently over the shared Pexels session, which
+        # keeps connections to the image CDN warm across runs; gather keeps the
+        # results in search term order, which start() relies on
+        session = get_http_session()
+        # Created per call: asyncio primitives bind to the running loop and
+        # streamlit starts a fresh loop for every generation
+        semaphore = asyncio.Semaphore(PEXELS_MAX_CONCURRENCY)
+        # Photo url -> its download, so terms resolving to the same photo share one
+        url_downloads: Dict[str, asyncio.Task] = {}
+        results = await asyncio.gather(*(
+            self._download_photo(session, semaphore, url_downloads, term, orientation, endpoint_type)
+            for term in search_terms
+        ))
         
-        for term in search_terms:
-            try:
+        return [photo_data for photo_data in results if photo_data]
+
+    async def _download_photo(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, url_downloads: Dict[str, asyncio.Task], term: str, orientation: str, endpoint_type: str):
+        """Search and download one photo for a search term, None if nothing was downloaded."""
+        # Same term, endpoint and orientation always resolve to the same photo
+        cache_key = hashlib.sha1(f"{endpoint_type}|{orientation}|{term}".encode()).hexdigest()
+        cached = self._load_cached_photo(cache_key, term)
+        if cached:
+            return cached
+        
+        try:
+            async with semaphore:
                 # Search for photos using the Pexels API with specified endpoint
                 photos = await search_for_stock_photos(
                     limit=1,  # Just get one photo per search term
@@ -121,39 +193,157 @@ class PhotoReelsMaker(BaseEngine):
                     metrics_logger=self.metrics_logger
                 )
                 
-                if photos:
-                    # Get the first photo
-                    photo = photos[0]
-                    
-                    # Download the photo
-                    photo_url = photo['src']['large']  # Use large size for better quality
-                    
-                    # Create a temporary file to store the photo
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as tmp:
-                        # Download the image
-                        async with aiohttp.ClientSession() as session:
-                            async with session.get(photo_url) as resp:
-                                if resp.status == 200:
-                                    content = await resp.read()
-                                    tmp.write(content)
-                                    photo_path = tmp.name
-                                else:
-                                    logger.error(f"Failed to download photo: {resp.status}")
-                                    continue
-                    
-                    # Add the photo data to our list
-                    photos_data.append({
-                        "term": term,
-                        "photo_path": photo_path,
-                        "metadata": photo
-                    })
-                    logger.info(f"Downloaded photo for term '{term}'")
-                else:
+                if not photos:
                     logger.warning(f"No photos found for term '{term}'")
-            except Exception as e:
-                logger.error(f"Error downloading photo for term '{term}': {e}")
+                    return None
+                
+                # Get the first photo
+                photo = photos[0]
+                
+                # Download the photo, unless another term of this run already is
+                photo_url = photo['src']['large']  # Use large size for better quality
+                download = url_downloads.get(photo_url)
+                if download is None:
+                    download = url_downloads[photo_url] = asyncio.ensure_future(
+                        self._download_photo_url(session, photo_url)
+                    )
+                photo_path = await download
+                if photo_path is None:
+                    return None
+            
+            self._cache_photo_metadata(cache_key, photo)
+            logger.info(f"Downloaded photo for term '{term}'")
+            return {
+                "term": term,
+                "photo_path": photo_path,
+                "metadata": photo
+            }
+        except Exception as e:
+            logger.error(f"Error downloading photo for term '{term}': {e}")
+            return None
+
+    async def _download_photo_url(self, session: aiohttp.ClientSession, photo_url: str) -> Optional[str]:
+        """Download a photo into the cache, keyed by its url, returning its path."""
+        image_path = _photo_cache_file(photo_url)
+        if os.path.exists(image_path):
+            logger.info(f"Using cached photo: {image_path}")
+            return image_path
+        
+        photo_path = await self._fetch_photo_file(session, photo_url)
+        if photo_path is None:
+            return None
+        try:
+            os.makedirs(photo_cache_path, exist_ok=True)
+            # The temp file may live on another filesystem, so move rather than rename
+            shutil.move(photo_path, image_path)
+            return image_path
+        except OSError as e:
+            logger.warning(f"Failed to cache photo: {e}")
+            # Whichever copy survived the failed move
+            return photo_path if os.path.exists(photo_path) else image_path
+
+    def _load_cached_photo(self, cache_key: str, term: str) -> Optional[Dict]:
+        """Return the cached photo data for a search, None on a cache miss."""
+        cache_file = os.path.join(photo_cache_path, f"{cache_key}.json")
+        try:
+            # Same expiry as the Pexels search responses
+            if time.time() - os.path.getmtime(cache_file) >= PEXELS_CACHE_TTL:
+                return None
+            with open(cache_file, "rb") as f:
+                metadata = orjson.loads(f.read())
+            image_path = _photo_cache_file(metadata['src']['large'])
+        except (OSError, orjson.JSONDecodeError, KeyError, TypeError):
+            return None
+        if not os.path.exists(image_path):
+            return None
+        
+        logger.info(f"Using cached photo for term '{term}': {image_path}")
+        return {
+            "term": term,
+            "photo_path": image_path,
+            "metadata": metadata
+        }
+
+    def _cache_photo_metadata(self, cache_key: str, metadata: Dict):
+        """Remember which photo a search resolved to."""
+        try:
+            os.makedirs(photo_cache_path, exist_ok=True)
+            cache_file = os.path.join(photo_cache_path, f"{cache_key}.json")
+            # Renamed into place, a crash or concurrent run never leaves a
+            # truncated file for the next run to load
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, "wb") as f:
+                f.write(orjson.dumps(metadata))
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            logger.warning(f"Failed to cache photo metadata: {e}")
+
+    async def _fetch_photo_file(self, session: aiohttp.ClientSession, photo_url: str) -> Optional[str]:
+        """Download a photo to a temp file, retrying rate limits, 5xx and connection errors with jittered backoff."""
+        for attempt in range(PHOTO_DOWNLOAD_ATTEMPTS):
+            last_attempt = attempt == PHOTO_DOWNLOAD_ATTEMPTS - 1
+            try:
+                async with session.get(photo_url, timeout=PHOTO_DOWNLOAD_TIMEOUT) as resp:
+                    if resp.status == 200:
+                        return await self._stream_to_temp_file(resp)
+                    if resp.status not in _RETRY_STATUSES or last_attempt:
+                        logger.error(f"Failed to download photo: {resp.status}")
+                        return None
+                    logger.warning(f"Photo download returned {resp.status}, retrying")
+            except aiohttp.ClientError as e:
+                if last_attempt:
+                    raise
+                logger.warning(f"Photo download failed ({e}), retrying")
+            await asyncio.sleep(0.5 * 2 ** attempt + random.random() * 0.2)
+        return None
+
+    async def _stream_to_temp_file(self, resp: aiohttp.ClientResponse) -> str:
+        """Write a response body to a temp .jpg in chunks, so the whole image is never held in memory."""
+        fd, photo_path = tempfile.mkstemp(suffix=".jpg")
+        try:
+            # 64 KiB writes land in the page cache, so plain blocking writes
+            # between socket reads don't stall the loop
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in resp.content.iter_chunked(64 * 1024):
+                    f.write(chunk)
+        except BaseException:
+            # Don't leave a truncated photo behind for a retry or cleanup to trip on
+            os.remove(photo_path)
+            raise
+        return photo_path
+
+    async def _synth_sentences(self, sentences: List[str], on_clip: Optional[Callable[[int, Dict], Awaitable[Any]]] = None) -> List[Dict]:
+        """Synthesize sentences as one batch, returned in sentence order.
         
-        return photos_data
+        `on_clip(index, clip)` is awaited as soon as each sentence's clip is ready.
+        """
+        clips: List[Optional[Dict]] = [None] * len(sentences)
+        
+        async def finish(i: int, audio_path) -> None:
+            clips[i] = await self._sentence_clip(i, sentences[i], audio_path)
+            if on_clip:
+                await on_clip(i, clips[i])
+        
+        await self.synth_generator.synth_speech_batch(
+            sentences, max_concurrency=TTS_MAX_CONCURRENCY, on_result=finish
+        )
+        return clips
+
+    async def _sentence_clip(self, i: int, sentence: str, audio_path) -> Dict:
+        """Clip for a synthesized sentence, falling back to silent audio if TTS failed."""
+        if isinstance(audio_path, BaseException):
+            # Generate silent audio as a fallback if TTS fails
+            logger.error(f"Error generating audio for sentence {i+1}: {audio_path}")
+            audio_path = await self._generate_silent_audio(len(sentence) / 15)  # Rough estimate
+        elif not audio_path:
+            # Generate silent audio as a fallback if TTS fails
+            logger.warning(f"Failed to generate audio for sentence {i+1}, creating silent audio")
+            audio_path = await self._generate_silent_audio(len(sentence) / 15)  # Rough estimate
+        
+        return {
+            "sentence": sentence,
+            "audio_path": audio_path
+        }
 
     def check_cancellation(self, st_state):
         """Check if the user requested to cancel the process."""
@@ -172,97 +362,98 @@ class PhotoReelsMaker(BaseEngine):
         Returns:
             StartResponse with the path to the generated video
         """
+        # Read once; the config stays mutable since the script is stored on it
+        cfg = self.config
+        
         # Get the script
-        script = await self.generate_script(self.config.prompt)
-        self.config.script = script  # Store for later use
+        script = await self.generate_script(cfg.prompt)
+        cfg.script = script  # Store for later use
+        
+        # Split once; search terms and narration must index the same sentences
+        sentences = split_by_dot_or_newline(script)
         
         # Extract search terms from the script
-        search_terms = await self.generate_search_terms(script)
+        search_terms = await self.generate_search_terms(script, sentences=sentences)
         
         # Determine orientation based on aspect ratio
-        orientation = "landscape"  # Default
-        if self.config.aspect_ratio == "9:16":
-            orientation = "portrait"
-        elif self.config.aspect_ratio == "1:1":
-            orientation = "square"
-        
-        # Download photos for each search term
-        photo_data = await self.download_photos(search_terms, orientation, self.config.photo_endpoint_type)
-        
-        # Check if photos were found
-        if not photo_data:
-            logger.error("No photos could be downloaded. Cannot continue with video generation.")
-            return StartResponse(status="error", error_message="No photos found", video_file_path=None)
-
-        # Check for cancellation
-        if self.check_cancellation(st_state):
-            self.cleanup_temp_files()
-            return StartResponse(status="cancelled", video_file_path=None)
+        orientation = _ASPECT_RATIO_ORIENTATIONS.get(cfg.aspect_ratio, "landscape")
         
-        # Create audio for each segment
-        sentences = split_by_dot_or_newline(script)
-        self.audio_clips = []  # Store on the instance instead of local variable
+        # Create audio for each segment. There is at most one photo per search
+        # term, so no sentence past len(search_terms) can be used
+        narrated_sentences = sentences[:len(search_terms)]
         
-        for i, sentence in enumerate(sentences):
-            # Only process if we have photos available
-            if i >= len(photo_data):
-                logger.warning(f"No photo available for sentence {i+1}, skipping")
-                continue
-                
-            try:
-                audio_path = await self.synth_generator.synth_speech(sentence)
-                if audio_path:
-                    self.audio_clips.append({
-                        "sentence": sentence,
-                        "audio_path": audio_path,
-                        "photo_data": photo_data[i]
-                    })
-                else:
-                    # Generate silent audio as a fallback if TTS fails
-                    logger.warning(f"Failed to generate audio for sentence {i+1}, creating silent audio")
-                    silent_audio_path = await self._generate_silent_audio(len(sentence) / 15)  # Rough estimate
-                    self.audio_clips.append({
-                        "sentence": sentence,
-                        "audio_path": silent_audio_path,
-                        "photo_data": photo_data[i]
-                    })
-            except Exception as e:
-                # Generate silent audio as a fallback if TTS fails
-                logger.error(f"Error generating audio for sentence {i+1}: {e}")
-                silent_audio_path = await self._generate_silent_audio(len(sentence) / 15)  # Rough estimate
-                self.audio_clips.append({
-                    "sentence": sentence,
-                    "audio_path": silent_audio_path,
-                    "photo_data": photo_data[i]
-                })
-        
-        # Check for cancellation again
-        if self.check_cancellation(st_state):
-            self.cleanup_temp_files()
-            return StartResponse(status="cancelled", video_file_path=None)
-        
-        # Check if audio clips were generated
-        if len(self.audio_clips) == 0:
-            logger.error("No audio clips were generated. Cannot create video.")
-            return StartResponse(status="error", error_message="Failed to generate audio", video_file_path="")
-        
-        # Generate subtitles
-        subtitles_path = await self.generate_subtitles(self.audio_clips)
-        
-        # Generate the final video
-        video_path = await self.photo_video_generator.generate_video(
-            audio_clips=self.audio_clips,
-            subtitles_path=subtitles_path,
-            aspect_ratio=self.config.aspect_ratio,
-            animation_style=self.config.animation_style,
-            transition_style=self.config.transition_style,
-            background_music_path=self.config.background_audio_url
-        )
+        # Encode settings are needed before the first segment starts
+        self.photo_video_generator.set_encoding(cfg.encode_threads, cfg.encode_preset)
         
-        return StartResponse(
-            status="success",
-            video_file_path=video_path
+        # TTS only needs the sentence text, so it runs while the photos for
+        # each search term download instead of after them
+        photos_task = asyncio.ensure_future(
+            self.download_photos(search_terms, orientation, cfg.photo_endpoint_type)
         )
+        
+        async def start_segment(i: int, clip: Dict) -> None:
+            # Encode each segment as soon as its audio and photo are ready,
+            # while later sentences are still being synthesized
+            photos = await photos_task
+            if i < len(photos):
+                self.photo_video_generator.start_segment(
+                    i, {**clip, "photo_data": photos[i]}, cfg.animation_style
+                )
+        
+        try:
+            sentence_audio = await self._synth_sentences(narrated_sentences, on_clip=start_segment)
+            photo_data = await photos_task
+        
+            # Check if photos were found
+            if not photo_data:
+                logger.error("No photos could be downloaded. Cannot continue with video generation.")
+                return StartResponse(status="error", error_message="No photos found", video_file_path=None)
+        
+            if len(sentences) > len(photo_data):
+                logger.warning(f"No photo available for sentences {len(photo_data)+1}-{len(sentences)}, skipping")
+        
+            # Store on the instance instead of local variable
+            self.audio_clips = [
+                {**clip, "photo_data": photo}
+                for clip, photo in zip(sentence_audio, photo_data)
+            ]
+        
+            # Check for cancellation
+            if self.check_cancellation(st_state):
+                await self.photo_video_generator.discard_segments()
+                await self.cleanup_temp_files_async()
+                return StartResponse(status="cancelled", video_file_path=None)
+        
+            # Check if audio clips were generated
+            if len(self.audio_clips) == 0:
+                logger.error("No audio clips were generated. Cannot create video.")
+                return StartResponse(status="error", error_message="Failed to generate audio", video_file_path="")
+        
+            # Generate subtitles
+            subtitles_path = await self.generate_subtitles(self.audio_clips)
+        
+            # Generate the final video
+            video_path = await self.photo_video_generator.generate_video(
+                audio_clips=self.audio_clips,
+                subtitles_path=subtitles_path,
+                aspect_ratio=cfg.aspect_ratio,
+                animation_style=cfg.animation_style,
+                transition_style=cfg.transition_style,
+                background_music_path=cfg.background_audio_url,
+                encode_threads=cfg.encode_threads,
+                encode_preset=cfg.encode_preset
+            )
+        
+            return StartResponse(
+                status="success",
+                video_file_path=video_path
+            )
+        finally:
+            # Segments are encoded while synthesis still runs; whatever
+            # generate_video didn't pick up (an error, an early return) must
+            # not keep encoding, nor the photo downloads keep running
+            await self.photo_video_generator.discard_segments()
+            photos_task.cancel()
     
     async def generate_subtitles(self, audio_clips):
         """
@@ -274,83 +465,73 @@ class PhotoReelsMaker(BaseEngine):
         Returns:
             Path to the generated subtitles file
         """
-        import pysrt
-        from datetime import timedelta
-        from pydub import AudioSegment
+        # Header reads (ffprobe for mp3) are blocking, so run them side by side
+        durations = await asyncio.gather(*(
+            asyncio.to_thread(_audio_duration, clip["audio_path"])
+            for clip in audio_clips
+        ))
         
-        subs = pysrt.SubRipFile()
+        # All timings up front, in integer milliseconds: each subtitle ends at the
+        # running total of the durations and starts where the previous one ended
+        ends_ms = list(accumulate(round(duration * 1000) for duration in durations))
+        starts_ms = [0, *ends_ms[:-1]]
         
-        current_time = 0  # Start time in seconds
-        
-        for i, clip in enumerate(audio_clips):
-            # Get audio duration
-            audio = AudioSegment.from_file(clip["audio_path"])
-            duration = len(audio) / 1000.0  # Convert ms to seconds
-            
-            # Create subtitle
-            # FIX: Convert timedelta to hours, minutes, seconds, milliseconds
-            start_time_td = timedelta(seconds=current_time)
-            end_time_td = timedelta(seconds=current_time + duration)
-            
-            # Convert timedelta to components for SubRipTime
-            start_hours, remainder = divmod(start_time_td.seconds, 3600)
-            start_minutes, start_seconds = divmod(remainder, 60)
-            start_milliseconds = start_time_td.microseconds // 1000
-            
-            end_hours, remainder = divmod(end_time_td.seconds, 3600)
-            end_minutes, end_seconds = divmod(remainder, 60)
-            end_milliseconds = end_time_td.microseconds // 1000
-            
-            # Create SubRipTime objects with the components
-            start = pysrt.SubRipTime(hours=start_hours, minutes=start_minutes, 
-                                   seconds=start_seconds, milliseconds=start_milliseconds)
-            end = pysrt.SubRipTime(hours=end_hours, minutes=end_minutes, 
-                                 seconds=end_seconds, milliseconds=end_milliseconds)
-            
-            # Create the subtitle item
-            subtitle = pysrt.SubRipItem(index=i+1, start=start, end=end, text=clip["sentence"])
-            subs.append(subtitle)
-            
-            # Update current time for next subtitle
-            current_time += duration
+        # SRT is plain text (index, start --> end, text, blank line), so build it
+        # in one string rather than through pysrt objects
+        srt = "".join(
+            f"{i}\n{_srt_time(start_ms)} --> {_srt_time(end_ms)}\n{clip['sentence']}\n\n"
+            for i, (clip, start_ms, end_ms) in enumerate(zip(audio_clips, starts_ms, ends_ms), 1)
+        )
         
         # Write subtitles to file
         subtitle_path = os.path.join(self.cwd, "tmp", f"subtitles_{int(time.time())}.srt")
         os.makedirs(os.path.dirname(subtitle_path), exist_ok=True)
-        subs.save(subtitle_path, encoding='utf-8')
+        Path(subtitle_path).write_text(srt, encoding='utf-8')
         
         return subtitle_path
     
     async def _generate_silent_audio(self, duration=3.0):
         """Generate silent audio as a fallback when TTS fails"""
-        from pydub import AudioSegment
-        import os
-
         # Create temp directory if it doesn't exist
         os.makedirs(os.path.join(self.cwd, "tmp"), exist_ok=True)
         
-        # Generate a silent audio segment
-        silent_audio = AudioSegment.silent(duration=int(duration * 1000))
+        # Unique name, several sentences can fall back within the same second
+        output_path = os.path.join(self.cwd, "tmp", f"silent_{uuid4().hex}.wav")
         
-        # Save to file
-        output_path = os.path.join(self.cwd, "tmp", f"silent_{int(time.time())}.wav")
-        silent_audio.export(output_path, format="wav")
+        # 16 kHz mono 16-bit PCM silence is just a RIFF header plus zeroed
+        # frames, no need to go through pydub/ffmpeg
+        n_samples = int(duration * SILENT_AUDIO_RATE)
+        with wave.open(output_path, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(SILENT_AUDIO_RATE)
+            w.writeframes(bytes(n_samples * 2))
         
         return output_path
 
+    async def cleanup_temp_files_async(self):
+        """cleanup_temp_files() on a worker thread, so the unlinks don't stall the event loop."""
+        await asyncio.to_thread(self.cleanup_temp_files)
+
     def cleanup_temp_files(self):
         """Clean up temporary files created during processing."""
         try:
-            # Clean up downloaded photos
-            for clip in self.audio_clips:
-                if "photo_data" in clip and "photo_path" in clip["photo_data"]:
-                    if os.path.exists(clip["photo_data"]["photo_path"]):
-                        os.remove(clip["photo_data"]["photo_path"])
+            # Downloaded photos; cached photos are kept for the next run
+            paths = [
+                clip["photo_data"]["photo_path"]
+                for clip in self.audio_clips
+                if "photo_data" in clip and "photo_path" in clip["photo_data"]
+                and not clip["photo_data"]["photo_path"].startswith(photo_cache_path)
+            ]
+            # Subtitles file
+            if getattr(self, "subtitles_path", None):
+                paths.append(self.subtitles_path)
             
-            # Clean up subtitles file
-            if hasattr(self, "subtitles_path") and os.path.exists(self.subtitles_path):
-                os.remove(self.subtitles_path)
+            # Unlinks are independent blocking syscalls (slow on network
+            # mounted tmp dirs), so overlap them
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                removed = sum(executor.map(remove_file, paths))
                 
-            logger.info("Temporary files cleaned up successfully")
+            logger.info(f"Temporary files cleaned up successfully ({removed} removed)")
         except Exception as e:
-            logger.error(f"Error cleaning up temporary files: {e}")
\ No newline at end of file
+            logger.error(f"Error cleaning up temporary files: {e}")
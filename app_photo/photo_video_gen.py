@@ -1,14 +1,150 @@
 from typing import Dict, List, Optional, Any, Literal
 from pathlib import Path
 import os
+import asyncio
 import tempfile
 import ffmpeg
 from PIL import Image
 from loguru import logger
 from pydantic import BaseModel
 import time
+import random
 import shutil
+import signal
 import multiprocessing
+from functools import lru_cache
+
+# Output frame per aspect ratio, every segment is fitted into it
+_FRAME_SIZES = {"16:9": (1920, 1080), "9:16": (1080, 1920), "1:1": (1080, 1080)}
+# Longest edge a segment is rendered at, the largest output frame's
+SEGMENT_MAX_EDGE = max(max(size) for size in _FRAME_SIZES.values())
+# Transition styles rendered with xfade; anything else ("none") is a hard cut
+_XFADE_TRANSITIONS = frozenset(("fade", "dissolve"))
+TRANSITION_DURATION = 1.0
+
+# RAM-backed temp dir for the intermediates, used when it has this much free
+SHM_DIR = "/dev/shm"
+SHM_MIN_FREE = 2 * 1024**3
+
+# Consumer GeForce cards cap concurrent NVENC sessions
+NVENC_MAX_SESSIONS = 2
+SEGMENT_TIMEOUT = 300  # seconds
+
+# NVENC output options: the encode runs on the GPU's dedicated encoder block
+_NVENC_OPTIONS = {"vcodec": "h264_nvenc", "preset": "p4", "tune": "hq", "rc": "vbr", "cq": 23}
+# Final output: monotonic timestamps from zero, and the moov atom up front
+# so the reel can be streamed/uploaded while it's still being read
+_PUBLISH_OPTIONS = {"fflags": "+genpts", "avoid_negative_ts": "make_zero", "movflags": "+faststart"}
+# libx264 fallbacks: per-photo segments are intermediates, the compose is final
+_X264_SEGMENT_OPTIONS = {"preset": "ultrafast", "tune": "fastdecode", "crf": 18, "g": 50}
+_X264_FINAL_OPTIONS = {"preset": "veryfast", "crf": 22}
+
+_TEST_SOURCE = ("-f", "lavfi", "-i", "color=black:s=256x256:d=0.1")
+
+def _ffmpeg_test_run(*args: str, source=_TEST_SOURCE) -> bool:
+    """Whether a tiny ffmpeg run with `args` applied to a test source succeeds."""
+    import subprocess
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-loglevel", "error",
+             *source, *args, "-f", "null", "-"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=15,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return result.returncode == 0
+
+@lru_cache(maxsize=1)
+def nvenc_available() -> bool:
+    """Whether ffmpeg can actually encode with h264_nvenc on this host.
+    
+    Probed once with a tiny test encode; `ffmpeg -encoders` lists NVENC in
+    any build with it compiled in, even without a usable GPU/driver.
+    """
+    available = _ffmpeg_test_run("-c:v", "h264_nvenc")
+    logger.info(f"H.264 encoder: {'h264_nvenc' if available else 'libx264'}")
+    return available
+
+@lru_cache(maxsize=1)
+def cuda_scale_filter() -> Optional[str]:
+    """The CUDA resize filter this ffmpeg can run (scale_npp or scale_cuda), if any."""
+    for scaler in ("scale_npp", "scale_cuda"):
+        if _ffmpeg_test_run(
+            "-vf", f"format=yuv420p,hwupload_cuda,{scaler}=128:128,hwdownload,format=yuv420p"
+        ):
+            logger.info(f"Using {scaler} for photo resizing")
+            return scaler
+    return None
+
+# Input options decoding the photo with NVDEC straight into GPU memory
+_NVDEC_INPUT_OPTIONS = {"hwaccel": "cuda", "hwaccel_output_format": "cuda"}
+
+@lru_cache(maxsize=1)
+def nvdec_jpeg_available() -> bool:
+    """Whether JPEG photos can be decoded by NVDEC and resized without leaving the GPU."""
+    scaler = cuda_scale_filter()
+    if not scaler:
+        return False
+    with tempfile.TemporaryDirectory() as tmp:
+        test_jpeg = os.path.join(tmp, "test.jpg")
+        Image.new("RGB", (256, 256)).save(test_jpeg)
+        available = _ffmpeg_test_run(
+            "-vf", f"{scaler}=128:128:format=yuv420p,hwdownload,format=yuv420p",
+            source=("-hwaccel", "cuda", "-hwaccel_output_format", "cuda", "-i", test_jpeg),
+        )
+    logger.info(f"Photo decoding: {'NVDEC' if available else 'CPU'}")
+    return available
+
+@lru_cache(maxsize=128)
+def _cached_image_size(path: str, mtime_ns: int) -> tuple:
+    # Image.open only parses the header, pixels are decoded on load()
+    with Image.open(path) as img:
+        return img.size
+
+def _image_size(path: str) -> tuple:
+    """(width, height) of an image, remembered per file version."""
+    return _cached_image_size(os.path.abspath(path), os.stat(path).st_mtime_ns)
+
+# ffmpeg runs in its own process group, so stopping it also stops any helper
+# processes it spawned instead of leaving them holding NVENC sessions
+if os.name == "nt":
+    import subprocess
+    _NEW_PROCESS_GROUP = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+else:
+    _NEW_PROCESS_GROUP = {"start_new_session": True}
+# Seconds ffmpeg gets to finalize its output after SIGTERM before SIGKILL
+FFMPEG_TERM_GRACE = 2
+
+def _signal_process_group(process, force=False):
+    """Stop an ffmpeg started with _NEW_PROCESS_GROUP: SIGTERM, or SIGKILL if force."""
+    if os.name == "nt":
+        if force:
+            process.kill()
+        else:
+            process.send_signal(signal.CTRL_BREAK_EVENT)
+        return
+    try:
+        # start_new_session made ffmpeg the group leader, its pid is the pgid
+        os.killpg(process.pid, signal.SIGKILL if force else signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+
+async def _cancel_tasks(tasks):
+    """Cancel tasks and wait until they're done; cancelling a segment kills its running ffmpeg."""
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+@lru_cache(maxsize=None)
+def _check_free_space(path: str) -> float:
+    """Log (and return) the free GB at path; checked once per process per filesystem root."""
+    free_space_gb = shutil.disk_usage(path).free / (1024**3)
+    logger.info(f"Available disk space: {free_space_gb:.2f} GB")
+    if free_space_gb < 1.0:
+        logger.warning("Low disk space! This may cause the process to hang.")
+    return free_space_gb
 
 class PhotoAnimationConfig(BaseModel):
     """Configuration for photo animations."""
@@ -26,10 +162,233 @@ class PhotoVideoGenerator:
             base_class: The parent engine class
         """
         self.base_class = base_class
-        self.temp_dir = tempfile.mkdtemp()
+        # Intermediates are written and re-read straight away, so keep them in
+        # RAM (tmpfs) when there's room for them
+        if os.path.isdir(SHM_DIR) and shutil.disk_usage(SHM_DIR).free > SHM_MIN_FREE:
+            self.temp_dir = tempfile.mkdtemp(dir=SHM_DIR)
+        else:
+            self.temp_dir = tempfile.mkdtemp()
         logger.info(f"Created temp directory: {self.temp_dir}")
+        
+        # x264 settings for every re-encoding step, set per run by set_encoding
+        self.encode_threads = multiprocessing.cpu_count()
+        self.encode_preset = None
+        
+        # ffprobe output by (absolute path, mtime), each probe is a subprocess
+        # launch; the mtime keeps a rewritten segment_{i}.mp4 from going stale
+        self._probe_cache: Dict[tuple, dict] = {}
+        
+        # Own generator seeded per process and instance, so segments encoded
+        # side by side (or in forked workers) don't draw the same pans
+        self._rng = random.Random(os.getpid() ^ time.time_ns())
+        
+        # Segments started before generate_video, by clip index
+        self._segment_tasks: Dict[int, asyncio.Task] = {}
+        # Bounds concurrent segment encodes, bound to the loop it was made on
+        self._segment_slots: Optional[asyncio.Semaphore] = None
+        self._segment_slots_loop = None
+    
+    def __del__(self):
+        # tmpfs is RAM, don't leave the intermediates behind
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def set_encoding(self, encode_threads: Optional[int] = None, encode_preset: Optional[str] = None):
+        """Set the x264 threads (defaults to all cores) and preset used by later encodes."""
+        self.encode_threads = encode_threads or multiprocessing.cpu_count()
+        self.encode_preset = encode_preset
     
-    def _apply_kenburns_effect(self, input_path, output_path, duration=5):
+    def start_segment(self, index: int, clip: Dict, animation_style: str = "kenburns"):
+        """Start encoding a clip's segment in the background.
+        
+        Lets the caller overlap segment encoding with the synthesis of later
+        clips; generate_video picks the finished segment up by index.
+        """
+        self._segment_tasks[index] = asyncio.ensure_future(
+            self._build_segment(index, clip, animation_style)
+        )
+    
+    async def discard_segments(self):
+        """Drop segments started by start_segment that generate_video won't use."""
+        tasks = list(self._segment_tasks.values())
+        self._segment_tasks.clear()
+        await _cancel_tasks(tasks)
+    
+    def _probe(self, path: str) -> dict:
+        """ffmpeg.probe(path), run once per file."""
+        key = (os.path.abspath(path), os.stat(path).st_mtime_ns)
+        info = self._probe_cache.get(key)
+        if info is None:
+            info = self._probe_cache[key] = ffmpeg.probe(path)
+        return info
+    
+    def _get_segment_slots(self) -> asyncio.Semaphore:
+        """Semaphore bounding concurrent segment encodes on the running loop."""
+        # Made per loop, like the Pexels session: streamlit runs every
+        # generation in a fresh asyncio.run loop
+        loop = asyncio.get_running_loop()
+        if self._segment_slots_loop is not loop:
+            self._segment_slots = asyncio.Semaphore(self._segment_concurrency())
+            self._segment_slots_loop = loop
+        return self._segment_slots
+    
+    def _segment_concurrency(self) -> int:
+        """How many segment encodes run at once."""
+        if nvenc_available():
+            return NVENC_MAX_SESSIONS
+        # Half the cores' worth of x264 encodes; _encode_kwargs splits
+        # encode_threads between them so the total stays under the CPU count
+        return max(1, multiprocessing.cpu_count() // 2)
+    
+    async def _run_async(self, stream, timeout=SEGMENT_TIMEOUT):
+        """Run an ffmpeg output node as an asyncio subprocess, raising ffmpeg.Error on failure."""
+        import subprocess
+        cmd = stream.compile()
+        process = await asyncio.create_subprocess_exec(
+            *cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, **_NEW_PROCESS_GROUP
+        )
+        try:
+            _, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except BaseException:
+            # Timed out or cancelled (discard_segments): don't leave it running
+            if process.returncode is None:
+                _signal_process_group(process)
+                try:
+                    await asyncio.wait_for(process.wait(), FFMPEG_TERM_GRACE)
+                except asyncio.TimeoutError:
+                    _signal_process_group(process, force=True)
+                    await process.wait()
+            raise
+        if process.returncode != 0:
+            raise ffmpeg.Error(cmd[0], None, stderr)
+    
+    async def _build_segment(self, i: int, clip: Dict, animation_style: str) -> str:
+        """Encode one photo + audio clip into segment_{i}.mp4, returning its path."""
+        async with self._get_segment_slots():
+            return await self._encode_segment(i, clip, animation_style)
+    
+    async def _encode_segment(self, i: int, clip: Dict, animation_style: str) -> str:
+        photo_path = clip["photo_data"]["photo_path"]
+        audio_path = clip["audio_path"]
+        
+        # Get audio duration using ffmpeg probe
+        audio_info = await asyncio.to_thread(self._probe, audio_path)
+        audio_duration = float(audio_info['format']['duration'])
+        
+        # Use audio duration for the photo animation (minimum 3 seconds for very short clips)
+        actual_duration = max(audio_duration, 3.0)
+        
+        # Create segment output path
+        segment_path = os.path.join(self.temp_dir, f"segment_{i}.mp4")
+        
+        # Create video from photo, muxing the audio in the same encode
+        await self._create_photo_video_segment(
+            photo_path=photo_path,
+            output_path=segment_path,
+            animation=animation_style,
+            duration=actual_duration,  # Match the audio duration
+            audio_path=audio_path,
+            audio_duration=audio_duration
+        )
+        
+        return segment_path
+    
+    def _encode_kwargs(self, final: bool = False) -> dict:
+        """ffmpeg output options shared by every H.264 encode.
+        
+        Without NVENC, segments (decoded once more by the final compose) use
+        the fastest x264 settings at a quality the compose won't visibly lose,
+        and the final encode a fast preset. encode_preset overrides both.
+        """
+        if nvenc_available():
+            # x264 threads / preset don't apply to the hardware encoder
+            return dict(_NVENC_OPTIONS)
+        # Segments encode side by side, each gets its share of the threads
+        threads = self.encode_threads if final else max(1, self.encode_threads // self._segment_concurrency())
+        kwargs = {"vcodec": "libx264", "threads": threads}
+        if self.encode_preset:
+            kwargs["preset"] = self.encode_preset
+        else:
+            kwargs.update(_X264_FINAL_OPTIONS if final else _X264_SEGMENT_OPTIONS)
+        return kwargs
+    
+    def _segment_output(self, video, output_path, duration, audio_path=None, audio_duration=None):
+        """
+        Output node encoding `video`, plus the clip's audio if given, to output_path.
+        
+        The audio is an extra input of the same ffmpeg run, so a segment is
+        written once instead of video-only and then re-muxed.
+        """
+        if audio_path is None:
+            return video.output(output_path, pix_fmt='yuv420p', **self._encode_kwargs())
+        
+        # If video is shorter than audio, hold its last frame
+        if audio_duration and duration < audio_duration:
+            video = video.filter('tpad', stop_mode='clone', stop_duration=audio_duration - duration)
+            duration = audio_duration
+        audio = ffmpeg.input(audio_path).audio
+        return ffmpeg.output(
+            video, audio, output_path,
+            pix_fmt='yuv420p', t=duration, **self._audio_kwargs(audio_path), **self._encode_kwargs()
+        )
+    
+    def _audio_kwargs(self, audio_path) -> dict:
+        """Output options for muxing audio_path: stream copy when it's already AAC."""
+        # Probed (and cached) by _encode_segment before the encode is built
+        streams = self._probe(audio_path).get('streams', [])
+        codec = next((st.get('codec_name') for st in streams if st.get('codec_type') == 'audio'), None)
+        if codec == 'aac':
+            return {"acodec": "copy"}
+        return {"acodec": "aac", "audio_bitrate": "192k"}
+    
+    def _kenburns_source(self, input_path, duration, width, height, gpu_decode=False):
+        """The photo as one frame resized to width x height, ready for zoompan.
+        
+        zoompan turns each input frame into d output frames, so it is fed the
+        photo once: decoded and resized a single time, not 25 times a second.
+        """
+        if gpu_decode:
+            # Decoded by NVDEC into VRAM, so the frame is never uploaded; it
+            # only comes back to system memory for zoompan
+            return (
+                ffmpeg.input(input_path, **_NVDEC_INPUT_OPTIONS)
+                .filter(cuda_scale_filter(), width, height, format='yuv420p')
+                .filter('hwdownload')
+                .filter('format', 'yuv420p')
+            )
+        
+        stream = ffmpeg.input(input_path)
+        scaler = cuda_scale_filter()
+        if scaler:
+            # Resample on the GPU; zoompan has no CUDA variant, so the
+            # frames come back to system memory right after the scale
+            return (
+                stream
+                .filter('format', 'yuv420p')
+                .filter('hwupload_cuda')
+                .filter(scaler, width, height)
+                .filter('hwdownload')
+                .filter('format', 'yuv420p')
+            )
+        return stream.filter('scale', width, height)
+    
+    def _downscale_photo(self, input_path, output_path, max_edge):
+        """Return (path, width, height) of the photo, shrunk to fit max_edge if larger.
+        
+        The copy is named after output_path, since segments for the same photo
+        may be built at the same time.
+        """
+        size = _image_size(input_path)
+        if max(size) <= max_edge:
+            return input_path, *size
+        with Image.open(input_path) as img:
+            # thumbnail() has libjpeg decode at a reduced scale (draft mode)
+            # before the final LANCZOS pass
+            img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+            resized_path = os.path.join(self.temp_dir, f"{Path(output_path).stem}_photo.jpg")
+            img.convert("RGB").save(resized_path, "JPEG", quality=92)
+            return resized_path, *img.size
+    
+    async def _apply_kenburns_effect(self, input_path, output_path, duration=5, audio_path=None, audio_duration=None):
         """
         Apply Ken Burns effect to a photo.
         
@@ -37,6 +396,8 @@ class PhotoVideoGenerator:
             input_path: Path to input image
             output_path: Path to output video
             duration: Duration of the effect in seconds
+            audio_path: Optional audio muxed into the output
+            audio_duration: Duration of the audio, if known
         """
         try:
             # First verify the input image exists and can be opened
@@ -44,21 +405,26 @@ class PhotoVideoGenerator:
                 logger.error(f"Input image does not exist: {input_path}")
                 raise FileNotFoundError(f"Input image not found: {input_path}")
                 
-            # Get image dimensions
-            img = Image.open(input_path)
-            width, height = img.size
-            img.close()  # Close image after reading dimensions
+            # Get image dimensions, shrinking huge stock photos once up front so
+            # zoompan doesn't resample the full-size photo on every frame
+            input_path, width, height = await asyncio.to_thread(
+                self._downscale_photo, input_path, output_path, 2 * SEGMENT_MAX_EDGE
+            )
             
             # Ensure width and height are even (required by some codecs)
             width = width if width % 2 == 0 else width - 1
             height = height if height % 2 == 0 else height - 1
+            # Rendered at up to the largest output frame; the 2x larger source
+            # leaves detail for zooming in
+            fit = min(1.0, SEGMENT_MAX_EDGE / max(width, height))
+            out_width = int(width * fit) // 2 * 2
+            out_height = int(height * fit) // 2 * 2
             
             # Ensure output directory exists
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             
             # Determine zoom direction randomly (in or out)
-            import random
-            zoom_in = random.choice([True, False])
+            zoom_in = self._rng.choice([True, False])
             
             if zoom_in:
                 # Zoom in effect
@@ -70,30 +436,48 @@ class PhotoVideoGenerator:
                 scale_end = 1.0
                 
             # Determine pan direction randomly
-            pan_x = random.uniform(-0.1, 0.1)
-            pan_y = random.uniform(-0.1, 0.1)
+            pan_x = self._rng.uniform(-0.1, 0.1)
+            pan_y = self._rng.uniform(-0.1, 0.1)
+            # Everything but the frame number and current zoom is known here, so
+            # fold it into constants rather than have ffmpeg's expression
+            # evaluator redo it on every frame
+            frames = round(duration * 25)
+            zoom_step = (scale_end - scale_start) / max(frames - 1, 1)
+            center_x = 0.5 + pan_x
+            center_y = 0.5 + pan_y
             
             # Apply zoom and pan effect with ffmpeg
             logger.debug(f"Running ffmpeg kenburns effect on {input_path}")
             
+            # NVDEC first when available; JPEGs it doesn't support (e.g. 4:4:4
+            # chroma) are retried with the CPU decoder
+            decoders = (True, False) if nvdec_jpeg_available() else (False,)
             try:
-                stream = (
-                    ffmpeg
-                    .input(input_path, loop=1, t=duration)
-                    .filter('scale', width, height)
-                    .filter(
+                for gpu_decode in decoders:
+                    stream = self._kenburns_source(input_path, duration, width, height, gpu_decode)
+                    stream = stream.filter(
                         'zoompan',
-                        z=f'if(lte(on,1),{scale_start},{scale_start}+((on-1)/({duration*25}-1))*({scale_end}-{scale_start}))', 
-                        x=f'iw/2-(iw/zoom/2)+{pan_x}*iw',
-                        y=f'ih/2-(ih/zoom/2)+{pan_y}*ih',
-                        d=duration*25,
-                        s=f'{width}x{height}'
+                        # Linear from scale_start on the first frame to scale_end
+                        # on the last (on counts from 1); no branch, zoompan
+                        # clamps zoom itself
+                        z=f'{scale_start}+(on-1)*({zoom_step:.8g})',
+                        # iw/2-(iw/zoom/2)+pan_x*iw, with the constants folded
+                        x=f'iw*({center_x:.8g}-0.5/zoom)',
+                        y=f'ih*({center_y:.8g}-0.5/zoom)',
+                        d=frames,
+                        s=f'{out_width}x{out_height}'
                     )
-                    .output(output_path, vcodec='libx264', pix_fmt='yuv420p')
-                    .global_args('-loglevel', 'warning')  # Add more logging
-                    .overwrite_output()
-                    .run(capture_stderr=True)  # Capture stderr for debugging
-                )
+                    try:
+                        await self._run_async(
+                            self._segment_output(stream, output_path, duration, audio_path, audio_duration)
+                            .global_args('-loglevel', 'warning')  # Add more logging
+                            .overwrite_output()
+                        )
+                        break
+                    except ffmpeg.Error:
+                        if not gpu_decode:
+                            raise
+                        logger.warning(f"NVDEC failed on {input_path}, decoding on the CPU")
                 
                 return output_path
             except ffmpeg.Error as e:
@@ -107,35 +491,37 @@ class PhotoVideoGenerator:
             # Return a path to a default image or raise the exception
             raise
     
-    def _apply_pan_effect(self, input_path, output_path, duration=5):
+    async def _apply_pan_effect(self, input_path, output_path, duration=5, audio_path=None, audio_duration=None):
         """Apply panning effect to a photo."""
         # Get image dimensions
-        img = Image.open(input_path)
-        width, height = img.size
+        width, height = _image_size(input_path)
         
         # Choose a random pan direction
-        import random
         directions = ['left', 'right', 'up', 'down']
-        direction = random.choice(directions)
-        
-        # Configure pan parameters based on direction
+        direction = self._rng.choice(directions)
+        last_frame = max(round(duration * 25) - 1, 1)
+
+        # Configure pan parameters based on direction. crop numbers frames
+        # with n (zoompan's on is undefined here) and clamps x/y itself
         if direction == 'left':
-            x_expr = f'if(lte(on,1),0,(on-1)/({duration*25}-1)*(iw*0.2))'
+            x_expr = f'n/{last_frame}*iw*0.2'
             y_expr = '0'
         elif direction == 'right':
-            x_expr = f'if(lte(on,1),iw*0.2,(1-(on-1)/({duration*25}-1))*(iw*0.2))'
+            x_expr = f'(1-n/{last_frame})*iw*0.2'
             y_expr = '0'
         elif direction == 'up':
             x_expr = '0'
-            y_expr = f'if(lte(on,1),0,(on-1)/({duration*25}-1)*(ih*0.2))'
+            y_expr = f'n/{last_frame}*ih*0.2'
         else:  # down
             x_expr = '0'
-            y_expr = f'if(lte(on,1),ih*0.2,(1-(on-1)/({duration*25}-1))*(ih*0.2))'
+            y_expr = f'(1-n/{last_frame})*ih*0.2'
         
-        # Apply pan effect
+        # Apply pan effect. At framerate=1 the photo is decoded once a second
+        # instead of per frame, fps then duplicates the decoded frames
         stream = (
             ffmpeg
-            .input(input_path, loop=1, t=duration)
+            .input(input_path, framerate=1, loop=1, t=duration)
+            .filter('fps', 25)
             .filter('scale', width, height)
             .filter(
                 'crop',
@@ -143,26 +529,29 @@ class PhotoVideoGenerator:
                 x_expr, y_expr
             )
             .filter('scale', width, height)  # scale back to original size
-            .output(output_path, vcodec='libx264', pix_fmt='yuv420p')
+        )
+        await self._run_async(
+            self._segment_output(stream, output_path, duration, audio_path, audio_duration)
             .overwrite_output()
-            .run(quiet=False)
         )
         
         return output_path
     
-    def _apply_simple_effect(self, input_path, output_path, duration=5):
+    async def _apply_simple_effect(self, input_path, output_path, duration=5, audio_path=None, audio_duration=None):
         """Create a video from a static photo."""
-        stream = (
-            ffmpeg
-            .input(input_path, loop=1, t=duration)
-            .output(output_path, vcodec='libx264', pix_fmt='yuv420p')
+        await self._run_async(
+            self._segment_output(
+                # Decoded once a second, not per frame (see _apply_pan_effect)
+                ffmpeg.input(input_path, framerate=1, loop=1, t=duration).filter('fps', 25),
+                output_path, duration, audio_path, audio_duration
+            )
             .overwrite_output()
-            .run(quiet=False)
         )
         
         return output_path
     
-    def _create_photo_video_segment(self, photo_path, output_path, animation="kenburns", duration=5):
+    async def _create_photo_video_segment(self, photo_path, output_path, animation="kenburns", duration=5,
+                                    audio_path=None, audio_duration=None):
         """
         Create a video segment from a photo with animation.
         
@@ -171,6 +560,8 @@ class PhotoVideoGenerator:
             output_path: Path to save the video segment
             animation: Animation style (kenburns, pan, static)
             duration: Duration of the segment in seconds
+            audio_path: Optional audio muxed into the segment
+            audio_duration: Duration of the audio, if known
             
         Returns:
             Path to the created video segment
@@ -179,156 +570,132 @@ class PhotoVideoGenerator:
         
         try:
             if animation == "kenburns":
-                return self._apply_kenburns_effect(photo_path, output_path, duration)
+                return await self._apply_kenburns_effect(photo_path, output_path, duration, audio_path, audio_duration)
             elif animation == "pan":
-                return self._apply_pan_effect(photo_path, output_path, duration)
+                return await self._apply_pan_effect(photo_path, output_path, duration, audio_path, audio_duration)
             else:  # static or fallback
-                return self._apply_simple_effect(photo_path, output_path, duration)
+                return await self._apply_simple_effect(photo_path, output_path, duration, audio_path, audio_duration)
         except Exception as e:
             # If any animation fails, fall back to simple effect
             logger.error(f"Animation '{animation}' failed: {e}. Falling back to static photo.")
-            return self._apply_simple_effect(photo_path, output_path, duration)
+            return await self._apply_simple_effect(photo_path, output_path, duration, audio_path, audio_duration)
     
-    def _apply_transition(self, clip1, clip2, output_path, transition="fade", duration=1.0):
-        """Apply transition between two video clips."""
-        try:
-            if transition == "fade":
-                # Create a crossfade transition
-                clip1_stream = ffmpeg.input(clip1)
-                clip2_stream = ffmpeg.input(clip2)
-                
-                # Get durations of clips
-                clip1_info = ffmpeg.probe(clip1)
-                clip1_duration = float(clip1_info['format']['duration'])
-                
-                # Create transition with xfade filter
-                # FIXED: Corrected xfade filter syntax
-                stream = ffmpeg.concat(
-                    clip1_stream.video.filter('setpts', 'PTS-STARTPTS').filter('fade', type='out', start_time=clip1_duration-duration, duration=duration),
-                    clip2_stream.video.filter('setpts', 'PTS-STARTPTS').filter('fade', type='in', duration=duration),
-                    v=1, a=0
-                )
-                
-                # Output the result
-                ffmpeg.output(stream, output_path).run(overwrite_output=True, quiet=False)
-                
-                return output_path
-            else:
-                # For other transitions, just concatenate
-                ffmpeg.concat(
-                    ffmpeg.input(clip1).video,
-                    ffmpeg.input(clip2).video,
-                    v=1, a=0
-                ).output(output_path).run(overwrite_output=True, quiet=False)
-                
-                return output_path
-        except ffmpeg.Error as e:
-            logger.error(f"FFmpeg error in transition: {e.stderr.decode('utf-8') if e.stderr else 'Unknown error'}")
-            # Fall back to simple concatenation
-            return self._simple_concat(clip1, clip2, output_path)
-    
-    def _simple_concat(self, clip1, clip2, output_path):
-        """Simple concatenation fallback when transitions fail."""
-        try:
-            # Create a concat file
-            concat_file = os.path.join(self.temp_dir, "simple_concat.txt")
-            with open(concat_file, 'w') as f:
-                f.write(f"file '{clip1}'\n")
-                f.write(f"file '{clip2}'\n")
-            
-            # Use concat demuxer
-            ffmpeg.input(concat_file, format='concat', safe=0).output(
-                output_path, c='copy'
-            ).run(overwrite_output=True, quiet=False)
-            
-            return output_path
-        except Exception as e:
-            logger.error(f"Simple concat failed: {e}")
-            # Just return the first clip as fallback
-            return clip1
+    def _subtitles_file(self, subtitles_path):
+        """Copy of the subtitles for the subtitles filter, or None when there are none."""
+        # First check if subtitles file exists and has content
+        if not subtitles_path or not os.path.exists(subtitles_path) or os.path.getsize(subtitles_path) == 0:
+            logger.warning(f"Empty or missing subtitles file: {subtitles_path}. Skipping subtitles.")
+            return None
+        
+        # Copied to the temp dir under a plain ASCII name, so the path needs no
+        # escaping beyond what ffmpeg-python applies to filter arguments
+        temp_subs = os.path.join(self.temp_dir, "subs.srt")
+        shutil.copy(subtitles_path, temp_subs)
+        return temp_subs
     
-    def _add_audio_to_video(self, video_path, audio_path, output_path):
+    def _compose_video(self, segments, durations, output_path, frame_size,
+                       transition="fade", subtitles=None, background_music_path=None):
         """
-        Add audio to a video.
+        Join the segments into the final video in a single ffmpeg run.
+        
+        Transitions, subtitles and background music are one filter graph, so
+        the segments are decoded once and the result encoded once, instead of
+        re-encoding per transition pair and again for subtitles and music.
         
         Args:
-            video_path: Path to the video file
-            audio_path: Path to the audio file
+            segments: Segment videos (with audio), in order
+            durations: Duration of each segment in seconds
             output_path: Path to save the result
-            
-        Returns:
-            Path to the video with audio
+            frame_size: (width, height) every segment is fitted into
+            transition: xfade transition name, or anything else for hard cuts
+            subtitles: Subtitles file (see _subtitles_file)
+            background_music_path: Optional music mixed under the narration
         """
-        # Get the durations
-        video_info = ffmpeg.probe(video_path)
-        video_duration = float(video_info['format']['duration'])
-        
-        audio_info = ffmpeg.probe(audio_path)
-        audio_duration = float(audio_info['format']['duration'])
+        width, height = frame_size
+        crossfade = transition in _XFADE_TRANSITIONS and len(segments) > 1
+        # ffmpeg may run from the subtitles' dir (below), so no path may be
+        # relative to ours
+        segments = [os.path.abspath(segment) for segment in segments]
+        output_path = os.path.abspath(output_path)
+        if subtitles:
+            subtitles = os.path.abspath(subtitles)
+        if background_music_path:
+            background_music_path = os.path.abspath(background_music_path)
         
-        # If video is shorter than audio, extend it
-        if video_duration < audio_duration:
-            # Create a temporary file for extended video
-            temp_video = os.path.join(self.temp_dir, "extended_video.mp4")
-            
-            # Get last frame and append it to extend the video
-            stream = (
-                ffmpeg
-                .input(video_path)
-                .filter('tpad', stop_mode='clone', stop_duration=audio_duration-video_duration)
-                .output(temp_video)
-                .overwrite_output()
-                .run(quiet=False)
+        video = None
+        video_parts = []
+        audio_parts = []
+        elapsed = 0.0
+        for i, (segment, duration) in enumerate(zip(segments, durations)):
+            stream = ffmpeg.input(segment)
+            # Photos differ in size, xfade/concat need identical frames
+            v = (
+                stream.video
+                .filter('scale', width, height, force_original_aspect_ratio='decrease')
+                .filter('pad', width, height, '(ow-iw)/2', '(oh-ih)/2')
+                .filter('setsar', 1)
+                .filter('fps', 25)
+                .filter('format', 'yuv420p')
+            )
+            # Pad/trim each clip's audio to its video so the narration and the
+            # subtitles (timed from the audio durations) stay in step
+            audio_parts.append(
+                stream.audio.filter('apad').filter('atrim', duration=duration)
+                .filter('asetpts', 'PTS-STARTPTS')
             )
             
-            video_path = temp_video
+            if not crossfade:
+                video_parts.append(v)
+                continue
+            if i < len(segments) - 1:
+                # Hold the last frame through the fade, so the overlap doesn't
+                # shorten the video relative to the audio
+                v = v.filter('tpad', stop_mode='clone', stop_duration=TRANSITION_DURATION)
+            if video is None:
+                video = v
+            else:
+                video = ffmpeg.filter(
+                    [video, v], 'xfade',
+                    transition=transition, duration=TRANSITION_DURATION, offset=elapsed,
+                )
+            elapsed += duration
+        
+        if not crossfade:
+            video = ffmpeg.concat(*video_parts, v=1, a=0) if len(video_parts) > 1 else video_parts[0]
+        audio = ffmpeg.concat(*audio_parts, v=0, a=1) if len(audio_parts) > 1 else audio_parts[0]
+        cwd = None
+        if subtitles:
+            if os.name == "nt":
+                # Drive-letter colons and backslash separators don't survive
+                # filter escaping reliably, so run from the file's dir instead
+                cwd, subtitles = os.path.split(subtitles)
+            video = video.filter('subtitles', filename=subtitles)
+        if background_music_path:
+            # duration=first: the music never runs past the narration
+            audio = ffmpeg.filter(
+                [audio, ffmpeg.input(background_music_path).audio], 'amix',
+                inputs=2, duration='first', dropout_transition=2,
+            )
         
-        # Add audio to video
         stream = (
             ffmpeg
-            .input(video_path)
-            .input(audio_path)
-            .output(output_path, vcodec='copy', acodec='aac')
+            .output(
+                video, audio, output_path,
+                pix_fmt='yuv420p', acodec='aac', **self._encode_kwargs(final=True), **_PUBLISH_OPTIONS
+            )
             .overwrite_output()
-            .run(quiet=False)
         )
-        
-        return output_path
+        return self._run_ffmpeg_command(stream, "composing final video", cwd=cwd)
     
-    def _apply_subtitles(self, video_path, subtitles_path, output_path):
-        """More reliable subtitle application method"""
-        # First check if subtitles file exists and has content
-        if not os.path.exists(subtitles_path) or os.path.getsize(subtitles_path) == 0:
-            logger.warning(f"Empty or missing subtitles file: {subtitles_path}. Skipping subtitles.")
-            # Just copy the video if no valid subtitles
-            shutil.copy(video_path, output_path)
-            return output_path
-        
-        # Fix potential path issues by copying subtitles to temp dir with simple name
-        temp_subs = os.path.join(self.temp_dir, "temp_subs.srt")
-        shutil.copy(subtitles_path, temp_subs)
-        
-        # Escape special characters in path for subtitles filter
-        escaped_subs = temp_subs.replace(":", "\\:").replace("'", "\\'")
-        
+    def _publish(self, src, dst):
+        """Move a finished file to dst without copying its bytes where possible."""
+        # A rename on the same filesystem; shutil.move only copies (with the
+        # kernel's zero-copy path) when dst is on another one
         try:
-            # Build FFmpeg command
-            stream = (
-                ffmpeg
-                .input(video_path)
-                .filter('subtitles', escaped_subs)
-                .output(output_path)
-                .overwrite_output()
-            )
-            
-            # Use timeout function
-            return self._run_ffmpeg_command(stream, "adding subtitles")
-        except Exception as e:
-            logger.error(f"Failed to add subtitles: {e}")
-            # Fall back to video without subtitles if this fails
-            logger.warning("Using video without subtitles as fallback")
-            shutil.copy(video_path, output_path)
-            return output_path
+            os.replace(src, dst)
+        except OSError:
+            shutil.move(src, dst)
+        return dst
     
     async def generate_video(self, 
                      audio_clips: List[Dict], 
@@ -336,7 +703,9 @@ class PhotoVideoGenerator:
                      aspect_ratio: str = "16:9",
                      animation_style: str = "kenburns",
                      transition_style: str = "fade",
-                     background_music_path: str = None) -> str:
+                     background_music_path: str = None,
+                     encode_threads: Optional[int] = None,
+                     encode_preset: Optional[str] = None) -> str:
         """
         Generate a video from photos and audio clips.
         
@@ -347,151 +716,76 @@ class PhotoVideoGenerator:
             animation_style: Animation style for photos
             transition_style: Transition style between segments
             background_music_path: Optional path to background music
+            encode_threads: x264 threads per encode (defaults to all cores)
+            encode_preset: x264 preset, e.g. "medium" (defaults to fast presets)
             
         Returns:
             Path to the final generated video
         """
-        # Add at the beginning of generate_video:
-        import shutil
-        import os
-        # Use the output directory as reference or fall back to current directory
-        disk_space_path = os.environ.get("PHOTO_OUTPUT_DIR", "./outputs/photos")
-        os.makedirs(os.path.dirname(disk_space_path), exist_ok=True)  # Ensure directory exists
-        disk_space = shutil.disk_usage(os.path.abspath(disk_space_path))
-        
-        free_space_gb = disk_space.free / (1024**3)
-        logger.info(f"Available disk space: {free_space_gb:.2f} GB")
-        if free_space_gb < 1.0:
-            logger.warning("Low disk space! This may cause the process to hang.")
+        if encode_threads or encode_preset:
+            self.set_encoding(encode_threads, encode_preset)
+
+        # Check the temp directory's filesystem, that's where the intermediates land
+        _check_free_space(os.path.dirname(self.temp_dir))
         
         logger.info("Starting video segment generation...")
         logger.info(f"Generating video from {len(audio_clips)} photo segments")
         
-        # Create individual video segments
-        video_segments = []
-        
+        # Segments are independent, so encode the ones start_segment hasn't
+        # started side by side; gathering the tasks in clip order keeps order
         for i, clip in enumerate(audio_clips):
-            logger.info(f"Processing segment {i+1}/{len(audio_clips)}...")
-            photo_path = clip["photo_data"]["photo_path"]
-            audio_path = clip["audio_path"]
-            
-            # Get audio duration using ffmpeg probe
-            audio_info = ffmpeg.probe(audio_path)
-            audio_duration = float(audio_info['format']['duration'])
-            
-            # Use audio duration for the photo animation (minimum 3 seconds for very short clips)
-            actual_duration = max(audio_duration, 3.0)
-            
-            # Create segment output path
-            segment_path = os.path.join(self.temp_dir, f"segment_{i}.mp4")
-            
-            # Create video from photo
-            video_only_path = os.path.join(self.temp_dir, f"video_only_{i}.mp4")
-            self._create_photo_video_segment(
-                photo_path=photo_path,
-                output_path=video_only_path,
-                animation=animation_style,
-                duration=actual_duration  # Match the audio duration
-            )
-            
-            # Add audio to segment
-            self._add_audio_to_video(
-                video_path=video_only_path,
-                audio_path=audio_path,
-                output_path=segment_path
-            )
-            
-            video_segments.append(segment_path)
-            logger.info(f"Completed segment {i+1}/{len(audio_clips)}")
+            if i not in self._segment_tasks:
+                self.start_segment(i, clip, animation_style)
+        segment_tasks = [self._segment_tasks.pop(i) for i in range(len(audio_clips))]
+        try:
+            video_segments = list(await asyncio.gather(*segment_tasks))
+        except BaseException:
+            # One failed segment must not leave the others encoding
+            await _cancel_tasks(segment_tasks)
+            raise
+        logger.info(f"Completed {len(video_segments)} segments")
         
-        # Combine segments with transitions
-        combined_segments = []
+        # Probe the segment lengths side by side, they place the transitions
+        durations = await asyncio.gather(*(
+            asyncio.to_thread(lambda path: float(self._probe(path)['format']['duration']), segment)
+            for segment in video_segments
+        ))
         
-        if len(video_segments) == 1:
-            # Only one segment, no transitions needed
-            combined_segments = video_segments
-        else:
-            # Apply transitions between segments
-            for i in range(len(video_segments) - 1):
-                output_path = os.path.join(self.temp_dir, f"transition_{i}.mp4")
-                
-                self._apply_transition(
-                    clip1=video_segments[i],
-                    clip2=video_segments[i+1],
-                    output_path=output_path,
-                    transition=transition_style
-                )
-                
-                combined_segments.append(output_path)
-            
-            # Add the last segment
-            combined_segments.append(video_segments[-1])
-        
-        # Create a concatenation file for ffmpeg
-        concat_file = os.path.join(self.temp_dir, "concat.txt")
-        with open(concat_file, 'w') as f:
-            for segment in combined_segments:
-                f.write(f"file '{segment}'\n")
-        
-        # Concatenate all segments
-        merged_video = os.path.join(self.temp_dir, "merged_video.mp4")
-        
-        ffmpeg.input(concat_file, format='concat', safe=0).output(
-            merged_video, c='copy'
-        ).run(overwrite_output=True)
-        
-        # Add subtitles
-        final_video_with_subs = os.path.join(self.temp_dir, "final_with_subs.mp4")
-        self._apply_subtitles(
-            video_path=merged_video,
-            subtitles_path=subtitles_path,
-            output_path=final_video_with_subs
+        final_output = os.path.join(
+            os.environ.get("PHOTO_OUTPUT_DIR", "./outputs/photos"), 
+            f"photo_reel_{int(time.time())}.mp4"
         )
         
-        # Add background music if provided
-        if background_music_path:
-            final_output = os.path.join(
-                os.environ.get("PHOTO_OUTPUT_DIR", "./outputs/photos"), 
-                f"photo_reel_{int(time.time())}.mp4"
+        # Ensure output directory exists
+        output_dir = os.path.dirname(final_output)
+        os.makedirs(output_dir, exist_ok=True)
+        
+        # Composed next to the output and renamed into place once complete, so
+        # the outputs directory never holds a half-written reel
+        partial_output = os.path.join(output_dir, f".{os.path.basename(final_output)}")
+        
+        frame_size = _FRAME_SIZES.get(aspect_ratio, _FRAME_SIZES["16:9"])
+        subtitles = self._subtitles_file(subtitles_path)
+        try:
+            await asyncio.to_thread(
+                self._compose_video, video_segments, durations, partial_output, frame_size,
+                transition_style, subtitles, background_music_path,
             )
-            
-            # Ensure output directory exists
-            output_dir = os.path.dirname(final_output)
-            os.makedirs(output_dir, exist_ok=True)
-            
-            try:
-                # Mix original audio with background music
-                stream = (
-                    ffmpeg
-                    .input(final_video_with_subs)
-                    .input(background_music_path)
-                    .filter_complex('[0:a][1:a]amix=inputs=2:duration=longest:dropout_transition=2[aout]')
-                    .global_args('-map', '0:v', '-map', '[aout]')
-                    .output(final_output)
-                    .overwrite_output()
-                )
-                self._run_ffmpeg_command(stream, "adding background music")
-            except Exception as e:
-                logger.error(f"Failed to add background music: {e}")
-                # Fall back to copying without background music
-                shutil.copy(final_video_with_subs, final_output)
-        else:
-            # Copy the file to final location
-            final_output = os.path.join(
-                os.environ.get("PHOTO_OUTPUT_DIR", "./outputs/photos"), 
-                f"photo_reel_{int(time.time())}.mp4"
+        except Exception as e:
+            if not (subtitles or background_music_path):
+                raise
+            # Fall back to the video without subtitles / music if they fail
+            logger.error(f"Failed to add subtitles or background music: {e}")
+            logger.warning("Using video without subtitles and music as fallback")
+            await asyncio.to_thread(
+                self._compose_video, video_segments, durations, partial_output, frame_size,
+                transition_style,
             )
-            
-            # Ensure output directory exists
-            output_dir = os.path.dirname(final_output)
-            os.makedirs(output_dir, exist_ok=True)
-            
-            # Copy the file
-            shutil.copy(final_video_with_subs, final_output)
+        self._publish(partial_output, final_output)
 
         # Cleanup temp files to free space
         try:
-            for file_path in video_segments + [merged_video, final_video_with_subs, concat_file]:
+            for file_path in video_segments:
                 if os.path.exists(file_path):
                     os.remove(file_path)
             logger.debug("Cleaned up temporary video files")
@@ -501,54 +795,58 @@ class PhotoVideoGenerator:
         logger.info(f"Video generation complete. Output: {final_output}")
         return final_output
 
-    def _run_ffmpeg_command(self, stream, description="FFmpeg operation"):
+    def _run_ffmpeg_command(self, stream, description="FFmpeg operation", cwd=None):
         """Run FFmpeg command with consistent error handling"""
         logger.debug(f"Running FFmpeg: {description}")
         try:
-            return run_with_timeout(stream, timeout=300)
+            return run_with_timeout(stream, timeout=300, cwd=cwd)
         except Exception as e:
             logger.error(f"FFmpeg {description} failed: {str(e)}")
             raise RuntimeError(f"FFmpeg operation failed: {str(e)}")
 
-def run_with_timeout(stream, timeout=300):
+def run_with_timeout(stream, timeout=300, cwd=None):
     """Run ffmpeg command with a reliable timeout limit"""
     import subprocess
     import threading
+    from collections import deque
     
     # Get the command that would be run
     cmd = stream.compile()
     logger.debug(f"Running FFmpeg command: {' '.join(cmd)}")
     
-    # Create process
+    # Create process. stdout is never used and only the tail of stderr matters
+    # for errors, so nothing is buffered beyond the last 512 lines
     process = subprocess.Popen(
         cmd,
-        stdout=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
         stderr=subprocess.PIPE,
-        universal_newlines=True
+        cwd=cwd,
+        **_NEW_PROCESS_GROUP,
     )
-    
-    # Function to kill process if it runs too long
-    def kill_process():
-        if process.poll() is None:  # If process is still running
-            logger.warning(f"FFmpeg process timed out after {timeout}s, killing it")
-            process.kill()
-    
-    # Start timer
-    timer = threading.Timer(timeout, kill_process)
-    timer.start()
+    stderr_tail = deque(maxlen=512)
+    # Drained in the background so a chatty ffmpeg never blocks on a full pipe
+    reader = threading.Thread(target=stderr_tail.extend, args=(process.stderr,), daemon=True)
+    reader.start()
     
     try:
-        # Wait for process to complete
-        stdout, stderr = process.communicate()
-        
-        # Check if successful
-        if process.returncode != 0:
-            logger.error(f"FFmpeg error: {stderr}")
-            raise subprocess.CalledProcessError(process.returncode, cmd, stderr)
-            
-        return stdout
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        logger.warning(f"FFmpeg process timed out after {timeout}s, killing it")
+        _signal_process_group(process)
+        try:
+            process.wait(timeout=FFMPEG_TERM_GRACE)
+        except subprocess.TimeoutExpired:
+            _signal_process_group(process, force=True)
+            process.wait()
     finally:
-        timer.cancel()  # Ensure timer is cancelled
+        reader.join()
+        process.stderr.close()
+    
+    # Check if successful
+    if process.returncode != 0:
+        stderr = b"".join(stderr_tail).decode("utf-8", errors="replace")
+        logger.error(f"FFmpeg error: {stderr}")
+        raise subprocess.CalledProcessError(process.returncode, cmd, stderr)
 
 def run_ffmpeg_safely(stream, description="FFmpeg operation", timeout=300):
     """Safe wrapper for FFmpeg operations with timeout"""
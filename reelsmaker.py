@@ -502,7 +502,7 @@ async def main():
         
         with vid_col1:
             # Convert slider to selectbox with increments of 5
-            max_bg_videos = int(os.getenv("MAX_BG_VIDEOS", 20))  # Default to 20 if not set
+            max_bg_videos = settings.max_bg_videos  # MAX_BG_VIDEOS, 20 if not set
             video_count_options = list(range(1, max_bg_videos + 1, 5))  # Create options: 5, 10, 15, 20...
             max_videos = st.selectbox(
                 "Number of videos to download",
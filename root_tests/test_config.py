@@ -0,0 +1,13 @@
+from app import config
+
+
+def test_empty_env_values_fall_back_to_defaults(monkeypatch):
+    # docker-compose passes `MAX_BG_VIDEOS=${MAX_BG_VIDEOS}` as "" when unset
+    for name in ("MAX_BG_VIDEOS", "SYNTH_CONCURRENCY", "SUBTITLE_MAX_CHARS"):
+        monkeypatch.setenv(name, "")
+
+    settings = getattr(config, "__Settings")(_env_file=None)
+
+    assert settings.max_bg_videos == 20
+    assert settings.synth_concurrency == 8
+    assert settings.subtitle_max_chars == 35
@@ -0,0 +1,24 @@
+import asyncio
+
+from app.utils import http_session
+
+
+async def _get_session():
+    return http_session.get_http_session()
+
+
+def test_session_is_reused_within_a_loop():
+    async def get_twice():
+        return http_session.get_http_session(), http_session.get_http_session()
+
+    first, second = asyncio.run(get_twice())
+    assert first is second
+
+
+def test_session_is_closed_when_its_loop_shuts_down():
+    first = asyncio.run(_get_session())
+    second = asyncio.run(_get_session())
+
+    assert first is not second
+    assert first.closed
+    assert second.closed
@@ -0,0 +1,56 @@
+from app.utils.negative_filter import NegativeFilter
+
+
+def test_filter_splits_items():
+    negative_filter = NegativeFilter(["fight", "jail"])
+
+    items = [
+        {"id": 1, "alt": "Kids playing in the park"},
+        {"id": 2, "alt": "Street FIGHT at night"},
+        {"id": 3, "alt": "Old jail and fighting ring"},
+    ]
+    kept, rejected = negative_filter.filter(items, lambda item: item["alt"])
+
+    assert [item["id"] for item in kept] == [1]
+    assert [(item["id"], keywords) for item, keywords in rejected] == [
+        (2, ["fight"]),
+        (3, ["jail", "fight"]),
+    ]
+
+
+def test_empty_keyword_list_rejects_nothing():
+    negative_filter = NegativeFilter([])
+
+    kept, rejected = negative_filter.filter([{"alt": "anything"}], lambda item: item["alt"])
+
+    assert len(kept) == 1
+    assert rejected == []
+
+
+def test_non_ascii_text_uses_unicode_lowercasing():
+    negative_filter = NegativeFilter(["fight"])
+
+    kept, rejected = negative_filter.filter(
+        [{"alt": "Café FIGHT"}, {"alt": "Café calm"}], lambda item: item["alt"]
+    )
+
+    assert [item["alt"] for item in kept] == ["Café calm"]
+    assert rejected[0][1] == ["fight"]
+
+
+def test_large_batches_match_per_item_filtering():
+    negative_filter = NegativeFilter(["fight", "jail"])
+
+    items = [
+        {"id": i, "alt": alt}
+        for i, alt in enumerate(
+            ["Calm lake", "Street FIGHT", "Café jail FIGHT", "fight", "", "Sunset"] * 10
+        )
+    ]
+    extractor = lambda item: item["alt"]
+
+    kept, rejected = negative_filter.filter(items, extractor)
+    expected = [negative_filter.filter([item], extractor) for item in items]
+
+    assert kept == [item for item_kept, _ in expected for item in item_kept]
+    assert rejected == [entry for _, item_rejected in expected for entry in item_rejected]
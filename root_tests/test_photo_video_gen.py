@@ -0,0 +1,37 @@
+import os
+
+from app_photo import photo_video_gen
+from app_photo.photo_video_gen import PhotoVideoGenerator
+
+
+def test_compose_with_relative_paths_survives_cwd_switch(tmp_path, monkeypatch):
+    """On Windows ffmpeg runs from the subtitles' dir, every other path must be absolute."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(photo_video_gen, "nvenc_available", lambda: False)
+    monkeypatch.setattr(os, "name", "nt")
+
+    subs_dir = tmp_path / "subs"
+    subs_dir.mkdir()
+    subtitles = subs_dir / "subs.srt"
+    subtitles.write_text("1\n00:00:00,000 --> 00:00:01,000\nHi\n")
+
+    generator = PhotoVideoGenerator(base_class=None)
+    calls = []
+    monkeypatch.setattr(
+        generator, "_run_ffmpeg_command",
+        lambda stream, description, cwd=None: calls.append((stream.get_args(), cwd)),
+    )
+
+    # Relative, like the default PHOTO_OUTPUT_DIR="./outputs/photos"
+    generator._compose_video(
+        ["seg_0.mp4", "seg_1.mp4"], [3.0, 3.0], "./outputs/photos/.reel.mp4",
+        (1080, 1920), "fade", str(subtitles), "music.mp3",
+    )
+
+    args, cwd = calls[0]
+    assert cwd == str(subs_dir)
+    inputs = [args[i + 1] for i, arg in enumerate(args) if arg == "-i"]
+    assert sorted(inputs) == sorted([
+        str(tmp_path / "seg_0.mp4"), str(tmp_path / "seg_1.mp4"), str(tmp_path / "music.mp3"),
+    ])
+    assert str(tmp_path / "outputs" / "photos" / ".reel.mp4") in args
@@ -0,0 +1,43 @@
+from app import reels_maker
+
+
+def _probe_with_fps(fps):
+    return {
+        "streams": [
+            {
+                "codec_type": "video", "codec_name": "h264", "width": 1080, "height": 1920,
+                "pix_fmt": "yuv420p", "r_frame_rate": fps, "time_base": "1/15360",
+                "sample_aspect_ratio": "1:1", "profile": "High",
+            },
+            {"codec_type": "audio", "codec_name": "aac", "sample_rate": "44100", "channels": 2},
+        ]
+    }
+
+
+class _FakeConcat:
+    def __init__(self, runs):
+        self.runs = runs
+
+    def output(self, *args, **kwargs):
+        return self
+
+    def run(self, **kwargs):
+        self.runs.append(kwargs)
+
+
+def test_clips_differing_only_in_fps_are_reencoded(monkeypatch):
+    probes = {"a.mp4": _probe_with_fps("30/1"), "b.mp4": _probe_with_fps("25/1")}
+    monkeypatch.setattr(reels_maker.ffmpeg, "probe", lambda clip: probes[clip])
+
+    filelist_calls = []
+    monkeypatch.setattr(
+        reels_maker, "concatenate_with_filelist",
+        lambda clips, output_path: filelist_calls.append(clips),
+    )
+    filter_runs = []
+    monkeypatch.setattr(reels_maker.ffmpeg, "concat", lambda *streams, **kwargs: _FakeConcat(filter_runs))
+
+    reels_maker.concatenate_clips(["a.mp4", "b.mp4"], "out.mp4")
+
+    assert filelist_calls == []
+    assert len(filter_runs) == 1